@@ -1,6 +1,7 @@
 from .apply_geometry_lookup_table import *
 from .constants import *
 from .diagnose_netcdf_issues import *
+from .download_file_ranges import *
 from .emit_ortho_raster import *
 from .emit_xarray import *
 from .EMITL2AMASKNetCDF import *
@@ -14,8 +15,11 @@ from .file_utils import *
 from .find_EMIT_L2A_RFL_granule import *
 from .generate_earthaccess_query import *
 from .generate_EMIT_L2A_RFL_timeseries import *
+from .get_download_session import *
 from .get_pixel_center_coords import *
 from .GLT import *
+from .granule_dates import *
+from .netcdf_lock import *
 from .ortho_xr import *
 from .read_elevation import *
 from .read_geolocation import *
@@ -31,4 +35,5 @@ from .show_netcdf_tree import *
 from .spatially_constrain_earthaccess_query import *
 from .temporally_constrain_earthaccess_query import *
 from .validate_NetCDF_file import *
+from .validate_NetCDF_files import *
 from .version import __version__
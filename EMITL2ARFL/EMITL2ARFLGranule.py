@@ -1,5 +1,6 @@
 from os.path import abspath, expanduser
-from typing import List, Union
+from typing import List, Optional, Union
+import netCDF4
 import numpy as np
 
 from rasterio.windows import Window
@@ -11,6 +12,7 @@ from .EMITL2ARFLNetCDF import EMITL2ARFLNetCDF
 from .EMITL2AMASKNetCDF import EMITL2AMASKNetCDF
 from .EMITL2ARFLUNCERTNetCDF import EMITL2ARFLUNCERTNetCDF
 from .constants import QUALITY_BANDS
+from .netcdf_lock import NETCDF_LOCK
 from .read_qmask import read_qmask
 from .emit_ortho_raster import emit_ortho_raster
 
@@ -19,10 +21,54 @@ from .read_netcdf_raster import read_netcdf_raster
 from .read_geolocation import read_geolocation
 
 class EMITL2ARFLGranule:
-    def __init__(self, reflectance_filename: str, mask_filename: str, uncertainty_filename: str) -> None:
+    def __init__(
+            self,
+            reflectance_filename: str,
+            mask_filename: str,
+            uncertainty_filename: str,
+            reflectance_ds: Optional[netCDF4.Dataset] = None) -> None:
         self.reflectance_filename: str = abspath(expanduser(reflectance_filename))
         self.mask_filename: str = abspath(expanduser(mask_filename))
         self.uncertainty_filename: str = abspath(expanduser(uncertainty_filename))
+        # The open reflectance dataset is owned by the granule and closed by close(). It is
+        # opened on first read if one isn't passed in, and reused by every read after.
+        self.reflectance_ds: Optional[netCDF4.Dataset] = reflectance_ds
+
+    def __enter__(self) -> "EMITL2ARFLGranule":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def reflectance_dataset(self) -> netCDF4.Dataset:
+        if self.reflectance_ds is None:
+            with NETCDF_LOCK:
+                self.reflectance_ds = netCDF4.Dataset(self.reflectance_filename, "r")
+
+        return self.reflectance_ds
+
+    def _close_datasets(self) -> None:
+        ds = getattr(self, "reflectance_ds", None)
+
+        if ds is not None:
+            if ds.isopen():
+                ds.close()
+
+            self.reflectance_ds = None
+
+    def close(self) -> None:
+        with NETCDF_LOCK:
+            self._close_datasets()
+
+    def __del__(self) -> None:
+        # A finalizer can run while this thread already holds the lock mid-read, so it never
+        # waits for it. A dataset left open here is still closed when netCDF4 frees it.
+        if NETCDF_LOCK.acquire(blocking=False):
+            try:
+                self._close_datasets()
+            finally:
+                NETCDF_LOCK.release()
 
     def __repr__(self) -> str:
         return (f"EMITL2ARFL(reflectance_filename=\"{self.reflectance_filename}\", "
@@ -74,7 +120,7 @@ class EMITL2ARFLGranule:
             swath_window: Window = None,
             geometry: RasterGeometry = None,
             quality_bands: List[int] = QUALITY_BANDS) -> Union[Raster, np.ndarray]:
-        granule_geolocation = read_geolocation(filename=self.reflectance_filename)
+        granule_geolocation = read_geolocation(filename=self.reflectance_filename, dataset=self.reflectance_dataset)
         
         if swath_window is None and geometry is not None:
             swath_window = granule_geolocation.window(geometry)
@@ -112,7 +158,7 @@ class EMITL2ARFLGranule:
             # If a window is not provided but a geometry is, compute the window from the geometry
         if swath_window is None and geometry is not None:
             # read the scene geolocation
-            geolocation = read_geolocation(filename=self.reflectance_filename)
+            geolocation = read_geolocation(filename=self.reflectance_filename, dataset=self.reflectance_dataset)
             # calculate the indices window that covers the target geometry
             swath_window = geolocation.window(geometry)
 
@@ -124,7 +170,8 @@ class EMITL2ARFLGranule:
             variable="reflectance",
             geometry=geometry,
             swath_window=swath_window,
-            qmask=qmask
+            qmask=qmask,
+            dataset=self.reflectance_dataset
         )
         
         if filter_clouds:
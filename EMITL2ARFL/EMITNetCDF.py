@@ -9,6 +9,7 @@ import netCDF4
 
 from rasters import Raster, RasterGeolocation, RasterGrid, RasterGeometry
 
+from .netcdf_lock import NETCDF_LOCK
 from .read_netcdf_raster import read_netcdf_raster
 from .read_netcdf_array import read_netcdf_array
 from .read_latitude_array import read_latitude_array
@@ -198,7 +199,7 @@ class EMITNetCDF:
             dict: Dictionary of attribute names and their values.
         """
         if self._metadata is None:
-            with netCDF4.Dataset(self.filename, 'r') as ds:
+            with NETCDF_LOCK, netCDF4.Dataset(self.filename, 'r') as ds:
                 self._metadata = {attr: ds.getncattr(attr) for attr in ds.ncattrs()}
 
         return self._metadata
@@ -211,7 +212,7 @@ class EMITNetCDF:
         Returns:
             List[str]: List of group names.
         """
-        with netCDF4.Dataset(self.filename, 'r') as ds:
+        with NETCDF_LOCK, netCDF4.Dataset(self.filename, 'r') as ds:
             return list(ds.groups.keys())
         
     def variables(self, group: str = None) -> List[str]:
@@ -224,7 +225,7 @@ class EMITNetCDF:
         Returns:
             List[str]: List of variable names.
         """
-        with netCDF4.Dataset(self.filename, 'r') as ds:
+        with NETCDF_LOCK, netCDF4.Dataset(self.filename, 'r') as ds:
             if group is None:
                 return list(ds.variables.keys())
             else:
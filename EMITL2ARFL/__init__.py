@@ -20,10 +20,10 @@ import sys
 if 'HDF5_USE_FILE_LOCKING' not in os.environ:
     os.environ['HDF5_USE_FILE_LOCKING'] = 'FALSE'
 
-# Check if netCDF4 was already imported (it shouldn't be at this point)
+# Check if netCDF4 was already imported (it shouldn't be at this point).
+# libhdf5 reads HDF5_USE_FILE_LOCKING when the library is first initialized,
+# so reloading the netCDF4 Python module cannot apply the setting - just warn.
 if 'netCDF4' in sys.modules:
-    # If it was already imported, try to reload it with the new setting
-    import importlib
     import warnings
     warnings.warn(
         "netCDF4 was already imported before EMITL2ARFL initialization. "
@@ -31,10 +31,6 @@ if 'netCDF4' in sys.modules:
         "For best results, import EMITL2ARFL before any packages that use netCDF4.",
         RuntimeWarning
     )
-    try:
-        importlib.reload(sys.modules['netCDF4'])
-    except Exception:
-        pass
 
 # Now safe to import all submodules
 from .EMITL2ARFL import *
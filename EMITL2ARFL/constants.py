@@ -7,4 +7,26 @@ EMIT_L2A_REFLECTANCE_DOI = "10.5067/EMIT/EMITL2ARFL.001"
 EMIT_L2A_REFLECTANCE_CONCEPT_ID = "C2408750690-LPCLOUD"
 
 DOWNLOAD_DIRECTORY = "~/data/EMIT_L2A_RFL"
-QUALITY_BANDS = [0, 1, 2, 3, 4]
\ No newline at end of file
+QUALITY_BANDS = [0, 1, 2, 3, 4]
+
+# file signatures used to reject truncated or non-NetCDF files before opening them
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+NETCDF_CLASSIC_SIGNATURES = (b"CDF\x01", b"CDF\x02", b"CDF\x05")
+MIN_HDF5_FILE_SIZE = 2048
+# leading bytes of an HDF5 file that hold the superblock fields up to the end-of-file address for every superblock version
+HDF5_SUPERBLOCK_SIZE = 64
+
+# leading bytes of a NetCDF-4/HDF5 file to prefetch before opening it (superblock and root metadata)
+NETCDF_HEADER_PREFETCH_SIZE = 1 << 20
+
+# per-file download retry backoff: retry_delay * 2 ** attempt, capped, with +/- jitter
+RETRY_MAX_DELAY = 30.0
+RETRY_JITTER = 0.5
+
+# ranged downloads: bytes per read from each range response, and statuses the HTTP session retries
+DOWNLOAD_RANGE_CHUNK_SIZE = 1 << 20
+DOWNLOAD_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# times a dropped range stream resumes from its last written byte before the file fails
+DOWNLOAD_RANGE_RESUMES = 3
+# connections the shared download session keeps open per host
+DOWNLOAD_SESSION_CONNECTIONS = 32
@@ -5,15 +5,22 @@ This script helps identify and diagnose NetCDF file corruption issues,
 particularly those related to HDF errors on HPC/network filesystems.
 """
 
+import fnmatch
+import io
 import logging
+import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, TextIO, Union
 import netCDF4
 
+from .constants import HDF5_SIGNATURE, NETCDF_CLASSIC_SIGNATURES, MIN_HDF5_FILE_SIZE
 from .validate_NetCDF_file import validate_NetCDF_file
-from .file_utils import compute_file_checksum, verify_file_readable
-from .exceptions import NetCDFValidationError
+from .file_utils import compute_file_checksum
+from .netcdf_lock import NETCDF_LOCK
+from .exceptions import NetCDFValidationError, NetCDFHDFCorruptionError
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +49,24 @@ def diagnose_netcdf_file(filepath: Union[str, Path], verbose: bool = True) -> di
         - 'error': str - Error message if validation failed
         - 'recommendation': str - Recommended action
     """
-    filepath = Path(filepath)
+    out = io.StringIO() if verbose else None
+    result = _diagnose_netcdf_file(filepath, out)
+    
+    if out is not None:
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
+    
+    return result
+
+
+def _diagnose_netcdf_file(filepath: Union[str, Path], out: Optional[TextIO]) -> dict:
+    """
+    Diagnose a NetCDF file, writing the verbose report to `out` if it is given.
+    """
+    verbose = out is not None
+    filepath = os.fspath(filepath)
     result = {
-        'filepath': str(filepath),
+        'filepath': filepath,
         'exists': False,
         'size': 0,
         'readable': False,
@@ -55,106 +77,132 @@ def diagnose_netcdf_file(filepath: Union[str, Path], verbose: bool = True) -> di
         'recommendation': None
     }
     
-    # Check existence
-    if not filepath.exists():
+    # Check existence and size with a single stat
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
         result['error'] = "File does not exist"
         result['recommendation'] = "Check file path or download the file"
         if verbose:
-            print(f"❌ File does not exist: {filepath}")
+            print(f"❌ File does not exist: {filepath}", file=out)
         return result
-    
-    result['exists'] = True
-    
-    # Check size
-    try:
-        result['size'] = filepath.stat().st_size
-        if verbose:
-            size_mb = result['size'] / (1024 * 1024)
-            print(f"📁 File size: {size_mb:.2f} MB ({result['size']} bytes)")
     except Exception as e:
+        result['exists'] = True
         result['error'] = f"Cannot access file stats: {e}"
         if verbose:
-            print(f"❌ {result['error']}")
+            print(f"❌ {result['error']}", file=out)
         return result
     
+    result['exists'] = True
+    result['size'] = st.st_size
+    
+    if verbose:
+        size_mb = result['size'] / (1024 * 1024)
+        print(f"📁 File size: {size_mb:.2f} MB ({result['size']} bytes)", file=out)
+    
     # Check if empty
     if result['size'] == 0:
         result['error'] = "File is empty (0 bytes)"
         result['recommendation'] = "Delete and re-download the file"
         if verbose:
-            print(f"❌ File is empty")
+            print(f"❌ File is empty", file=out)
         return result
     
-    # Check basic readability
-    result['readable'] = verify_file_readable(filepath)
+    # Check basic readability - size is already known, so only permissions remain
+    result['readable'] = os.access(filepath, os.R_OK)
     if not result['readable']:
         result['error'] = "File cannot be opened for reading"
         result['recommendation'] = "Check file permissions or filesystem issues"
         if verbose:
-            print(f"❌ File cannot be read (permission or I/O error)")
+            print(f"❌ File cannot be read (permission or I/O error)", file=out)
         return result
     
     if verbose:
-        print(f"✅ File is readable")
+        print(f"✅ File is readable", file=out)
+    
+    # Check the file signature before paying for a full NetCDF open
+    try:
+        with open(filepath, 'rb', buffering=0) as f:
+            signature = f.read(len(HDF5_SIGNATURE))
+    except OSError as e:
+        result['readable'] = False
+        result['error'] = f"File cannot be read: {e}"
+        result['recommendation'] = "Check file permissions or filesystem issues"
+        if verbose:
+            print(f"❌ File cannot be read (permission or I/O error)", file=out)
+        return result
+    
+    if not signature.startswith(NETCDF_CLASSIC_SIGNATURES):
+        if signature != HDF5_SIGNATURE:
+            result['error'] = "Not an HDF5 or NetCDF file (missing file signature)"
+        elif result['size'] < MIN_HDF5_FILE_SIZE:
+            result['error'] = "File too small to be valid HDF5/NetCDF"
+        
+        if result['error'] is not None:
+            result['recommendation'] = "Delete and re-download the file"
+            if verbose:
+                print(f"❌ {result['error']}", file=out)
+            return result
     
     # Try NetCDF validation
     try:
         validate_NetCDF_file(filepath, file_type="NetCDF")
         result['valid_netcdf'] = True
         if verbose:
-            print(f"✅ File passes NetCDF validation")
+            print(f"✅ File passes NetCDF validation", file=out)
+    except NetCDFHDFCorruptionError as e:
+        result['error'] = str(e)
+        result['recommendation'] = (
+            "HDF error detected - file is likely corrupted during download. "
+            "Delete the file and re-download. "
+            "On HPC systems, consider increasing retry delays."
+        )
+        if verbose:
+            print(f"❌ HDF/NetCDF format error (likely corruption)", file=out)
+            print(f"   Error: {e}", file=out)
+        return result
     except NetCDFValidationError as e:
         result['error'] = str(e)
-        
-        # Check for specific error patterns
-        error_str = str(e).lower()
-        if "errno -101" in error_str or "hdf error" in error_str:
-            result['recommendation'] = (
-                "HDF error detected - file is likely corrupted during download. "
-                "Delete the file and re-download. "
-                "On HPC systems, consider increasing retry delays."
-            )
-            if verbose:
-                print(f"❌ HDF/NetCDF format error (likely corruption)")
-                print(f"   Error: {e}")
-        else:
-            result['recommendation'] = "File validation failed - see error message"
-            if verbose:
-                print(f"❌ NetCDF validation failed")
-                print(f"   Error: {e}")
-        
+        result['recommendation'] = "File validation failed - see error message"
+        if verbose:
+            print(f"❌ NetCDF validation failed", file=out)
+            print(f"   Error: {e}", file=out)
         return result
     
-    # Try to read NetCDF structure
+    # Try to read NetCDF structure. diagnose_directory runs this from many threads
+    # and netCDF-C is not thread-safe, so only this part is serialized.
     try:
-        with netCDF4.Dataset(filepath, 'r') as ds:
-            result['dimensions'] = {name: dim.size for name, dim in ds.dimensions.items()}
-            result['variables'] = list(ds.variables.keys())
+        with NETCDF_LOCK, netCDF4.Dataset(filepath, 'r') as ds:
+            # Only names and dimension sizes here - per-variable shape/dtype
+            # lookups are deferred to the handful of sampled variables below
+            variables = ds.variables
+            result['dimensions'] = {name: len(dim) for name, dim in ds.dimensions.items()}
+            result['variables'] = list(variables)
             
             if verbose:
-                print(f"✅ NetCDF structure:")
-                print(f"   Dimensions: {list(result['dimensions'].keys())}")
-                print(f"   Variables: {len(result['variables'])} found")
+                print(f"✅ NetCDF structure:", file=out)
+                print(f"   Dimensions: {list(result['dimensions'].keys())}", file=out)
+                print(f"   Variables: {len(result['variables'])} found", file=out)
                 
                 # Show a few sample variables
                 sample_vars = result['variables'][:5]
                 for var in sample_vars:
-                    var_obj = ds.variables[var]
-                    print(f"      - {var}: shape={var_obj.shape}, dtype={var_obj.dtype}")
+                    var_obj = variables[var]
+                    print(f"      - {var}: shape={var_obj.shape}, dtype={var_obj.dtype}", file=out)
                 
                 if len(result['variables']) > 5:
-                    print(f"      ... and {len(result['variables']) - 5} more variables")
+                    print(f"      ... and {len(result['variables']) - 5} more variables", file=out)
     
     except Exception as e:
         result['error'] = f"Cannot read NetCDF structure: {e}"
         result['recommendation'] = "File may be corrupted - delete and re-download"
         if verbose:
-            print(f"❌ Cannot read NetCDF structure")
-            print(f"   Error: {e}")
+            print(f"❌ Cannot read NetCDF structure", file=out)
+            print(f"   Error: {e}", file=out)
         return result
     
     if verbose:
-        print(f"\n✅ File appears to be valid and complete")
+        print(f"\n✅ File appears to be valid and complete", file=out)
     
     return result
 
@@ -183,48 +231,63 @@ def diagnose_directory(directory: Union[str, Path], pattern: str = "*.nc", verbo
         logger.error(f"Directory does not exist: {directory}")
         return []
     
-    files = list(directory.glob(pattern))
+    # A single readdir with cached entry types, instead of a stat per globbed path
+    pattern_regex = re.compile(fnmatch.translate(pattern))
+    
+    with os.scandir(directory) as entries:
+        files = sorted(
+            entry.path
+            for entry in entries
+            if entry.is_file() and pattern_regex.match(entry.name)
+        )
     
     if not files:
         logger.warning(f"No files matching '{pattern}' found in {directory}")
         return []
     
-    if verbose:
-        print(f"\n{'='*70}")
-        print(f"Diagnosing {len(files)} NetCDF files in: {directory}")
-        print(f"{'='*70}\n")
+    # Diagnose files concurrently - each check is dominated by filesystem latency.
+    # The stat, signature and h5py validation overlap; the netCDF4 structure reads
+    # take NETCDF_LOCK and run one at a time. Each worker writes its report to its own buffer, printed in file order below.
+    outputs = [io.StringIO() if verbose else None for filepath in files]
     
-    results = []
-    for i, filepath in enumerate(files, 1):
-        if verbose:
-            print(f"\n[{i}/{len(files)}] Diagnosing: {filepath.name}")
-            print("-" * 70)
-        
-        result = diagnose_netcdf_file(filepath, verbose=verbose)
-        results.append(result)
+    with ThreadPoolExecutor(max_workers=min(32, len(files))) as executor:
+        results = list(executor.map(_diagnose_netcdf_file, files, outputs))
     
-    # Summary
+    # Report and summary
     if verbose:
-        print(f"\n{'='*70}")
-        print("SUMMARY")
-        print(f"{'='*70}")
+        out = io.StringIO()
+        print(f"\n{'='*70}", file=out)
+        print(f"Diagnosing {len(files)} NetCDF files in: {directory}", file=out)
+        print(f"{'='*70}\n", file=out)
+        
+        for i, (filepath, file_output) in enumerate(zip(files, outputs), 1):
+            print(f"\n[{i}/{len(files)}] Diagnosing: {os.path.basename(filepath)}", file=out)
+            print("-" * 70, file=out)
+            out.write(file_output.getvalue())
+        
+        print(f"\n{'='*70}", file=out)
+        print("SUMMARY", file=out)
+        print(f"{'='*70}", file=out)
         
         valid_count = sum(1 for r in results if r['valid_netcdf'])
         invalid_count = len(results) - valid_count
         
-        print(f"Total files: {len(results)}")
-        print(f"Valid: {valid_count}")
-        print(f"Invalid: {invalid_count}")
+        print(f"Total files: {len(results)}", file=out)
+        print(f"Valid: {valid_count}", file=out)
+        print(f"Invalid: {invalid_count}", file=out)
         
         if invalid_count > 0:
-            print(f"\nInvalid files:")
+            print(f"\nInvalid files:", file=out)
             for r in results:
                 if not r['valid_netcdf']:
-                    print(f"  - {Path(r['filepath']).name}")
+                    print(f"  - {os.path.basename(r['filepath'])}", file=out)
                     if r['error']:
-                        print(f"    Error: {r['error'][:100]}")
+                        print(f"    Error: {r['error'][:100]}", file=out)
                     if r['recommendation']:
-                        print(f"    Action: {r['recommendation']}")
+                        print(f"    Action: {r['recommendation']}", file=out)
+        
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
     
     return results
 
@@ -23,6 +23,11 @@ class NetCDFCorruptedError(NetCDFValidationError):
     pass
 
 
+class NetCDFHDFCorruptionError(NetCDFCorruptedError):
+    """Exception raised when the HDF5 layer of a NetCDF file reports an error, typically from a corrupted download."""
+    pass
+
+
 class NetCDFReadError(NetCDFValidationError):
     """Exception raised when a NetCDF file cannot be read due to I/O errors."""
     pass
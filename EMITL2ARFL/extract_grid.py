@@ -4,13 +4,14 @@ from rasterio.windows import Window
 
 from rasters import RasterGrid
 
+from .netcdf_lock import NETCDF_LOCK
 from .read_dimensions import read_dimensions
 
 def extract_grid(
         filename: str,
         window: Window = None
         ) -> RasterGrid:
-    with netCDF4.Dataset(filename, 'r') as ds:
+    with NETCDF_LOCK, netCDF4.Dataset(filename, 'r') as ds:
         geotransform = ds.getncattr("geotransform")
     
     dimensions = read_dimensions(filename=filename)
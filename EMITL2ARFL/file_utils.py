@@ -5,43 +5,141 @@ This module provides helper functions for robust file operations in challenging
 environments like HPC clusters with network filesystems (NFS, Lustre, etc.).
 """
 
+import errno
+import json
 import logging
 import hashlib
+import os
+import sys
 import time
 from pathlib import Path
-from typing import Union, Optional
+from typing import Iterable, Union, Optional
 
 logger = logging.getLogger(__name__)
 
+VALIDATION_MARKER_FILENAME = ".validated"
 
-def compute_file_checksum(filepath: Union[str, Path], algorithm: str = 'md5', chunk_size: int = 8192) -> str:
+# errors worth retrying when removing files on network filesystems
+_TRANSIENT_REMOVE_ERRNOS = (errno.EBUSY, errno.EACCES, errno.ENFILE)
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+
+def compute_file_checksum(filepath: Union[str, Path], algorithm: str = 'md5', chunk_size: int = 1 << 20) -> str:
     """
     Compute a checksum for a file.
     
+    On Python 3.11+ the file is streamed through ``hashlib.file_digest``, which
+    hashes in C without a Python-level read loop. If the optional ``blake3``
+    package is installed, ``algorithm='blake3'`` hashes a memory map of the file
+    with SIMD-accelerated BLAKE3 across all available cores, which is roughly an
+    order of magnitude faster than MD5 on multi-GB granules. ``algorithm='xxh3_64'``
+    uses the optional ``xxhash`` package, a fast non-cryptographic hash.
+    
     Parameters
     ----------
     filepath : str or Path
         Path to the file
     algorithm : str, optional
-        Hash algorithm to use ('md5', 'sha256', etc.). Defaults to 'md5'.
+        Hash algorithm to use ('md5', 'sha256', 'blake3', 'xxh3_64', etc.). Defaults to 'md5'.
     chunk_size : int, optional
-        Size of chunks to read at a time (in bytes). Defaults to 8192.
+        Size of chunks to read at a time (in bytes) when ``hashlib.file_digest``
+        is not available. Defaults to 1 MiB.
     
     Returns
     -------
     str
         Hexadecimal digest of the file
     """
-    hasher = hashlib.new(algorithm)
-    filepath = Path(filepath)
-    
-    with open(filepath, 'rb') as f:
+    filepath = os.fspath(filepath)
+
+    if algorithm == 'blake3':
+        if blake3 is None:
+            raise ValueError("algorithm 'blake3' requires the optional blake3 package")
+
+        # memory-mapped, SIMD and multi-threaded - no Python read loop or chunk copies
+        hasher = blake3(max_threads=blake3.AUTO)
+        hasher.update_mmap(filepath)
+        return hasher.hexdigest()
+
+    if algorithm == 'xxh3_64':
+        if xxhash is None:
+            raise ValueError("algorithm 'xxh3_64' requires the optional xxhash package")
+
+        hasher = xxhash.xxh3_64()
+    elif hasattr(hashlib, 'file_digest'):
+        with open(filepath, 'rb') as f:
+            return hashlib.file_digest(f, algorithm).hexdigest()
+    else:
+        hasher = hashlib.new(algorithm)
+
+    with open(filepath, 'rb', buffering=0) as f:
         while chunk := f.read(chunk_size):
             hasher.update(chunk)
     
     return hasher.hexdigest()
 
 
+def fast_checksum_algorithm() -> Optional[str]:
+    """
+    Name the fastest checksum algorithm available for `compute_file_checksum`.
+    
+    Prefers BLAKE3, then xxHash, both from the optional ``checksum`` extra.
+    These are suitable for detecting partial or corrupted downloads, not
+    for security. The standard-library hashes run at a fraction of their
+    speed, too slow to spend on every multi-GB download, so None is returned
+    when neither package is installed.
+    
+    Returns
+    -------
+    str or None
+        'blake3' or 'xxh3_64', or None if neither is installed
+    """
+    if blake3 is not None:
+        return 'blake3'
+
+    if xxhash is not None:
+        return 'xxh3_64'
+
+    return None
+
+
+def _wait_for_file_quiescence(filepath: str, check_interval: float, max_checks: int) -> bool:
+    """
+    Block on inotify events until a file is closed by its writer or sees no writes for one check interval.
+    """
+    inotify = INotify()
+
+    try:
+        inotify.add_watch(os.path.dirname(filepath) or ".", inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE)
+        filename = os.path.basename(filepath)
+
+        for i in range(max_checks):
+            events = [event for event in inotify.read(timeout=int(check_interval * 1000)) if event.name == filename]
+
+            # no writes for a full interval, or the writer just closed the file
+            if not events or events[-1].mask & inotify_flags.CLOSE_WRITE:
+                logger.debug(f"File stable after {i+1} checks: {filepath}")
+                return True
+    finally:
+        inotify.close()
+
+    return False
+
+
 def wait_for_file_stability(
     filepath: Union[str, Path],
     check_interval: float = 0.5,
@@ -54,6 +152,11 @@ def wait_for_file_stability(
     This is useful on network filesystems where file writes may be buffered
     and not immediately visible, or where downloads may still be in progress.
     
+    On Linux with the optional ``inotify_simple`` package installed, this blocks
+    on write events for the file and returns as soon as the writer closes it
+    (IN_CLOSE_WRITE) or no write is seen for ``check_interval`` seconds. Otherwise the file size is polled, backing off
+    exponentially while the file is still growing.
+    
     Parameters
     ----------
     filepath : str or Path
@@ -70,18 +173,29 @@ def wait_for_file_stability(
     bool
         True if file became stable, False if max_checks exceeded
     """
-    filepath = Path(filepath)
+    filepath = os.fspath(filepath)
     
-    if not filepath.exists():
+    if not os.path.exists(filepath):
         logger.warning(f"File does not exist: {filepath}")
         return False
+
+    if check_size and INotify is not None and sys.platform.startswith("linux"):
+        try:
+            if _wait_for_file_quiescence(filepath, check_interval, max_checks):
+                return True
+
+            logger.warning(f"File may not be stable after {max_checks} checks: {filepath}")
+            return False
+        except OSError as e:
+            logger.debug(f"inotify unavailable, falling back to polling: {e}")
     
     previous_size = None
     stable_count = 0
+    interval = check_interval
     
     for i in range(max_checks):
         try:
-            current_size = filepath.stat().st_size
+            current_size = os.stat(filepath).st_size
             
             if check_size and previous_size is not None:
                 if current_size == previous_size:
@@ -91,9 +205,11 @@ def wait_for_file_stability(
                         return True
                 else:
                     stable_count = 0
+                    # Still growing - back off to avoid hammering the filesystem with stats
+                    interval = min(interval * 2, check_interval * 8)
             
             previous_size = current_size
-            time.sleep(check_interval)
+            time.sleep(interval)
             
         except Exception as e:
             logger.warning(f"Error checking file stability: {e}")
@@ -107,6 +223,10 @@ def safe_file_remove(filepath: Union[str, Path], max_attempts: int = 3, delay: f
     """
     Safely remove a file with retry logic for network filesystems.
     
+    Removal is retried with exponential backoff only for transient errors
+    (busy file, permission race, file table exhaustion); other errors fail
+    immediately.
+    
     Parameters
     ----------
     filepath : str or Path
@@ -114,58 +234,292 @@ def safe_file_remove(filepath: Union[str, Path], max_attempts: int = 3, delay: f
     max_attempts : int, optional
         Maximum number of removal attempts. Defaults to 3.
     delay : float, optional
-        Seconds to wait between attempts. Defaults to 0.5.
+        Seconds to wait before the first retry, doubling on each further retry. Defaults to 0.5.
     
     Returns
     -------
     bool
         True if file was successfully removed or doesn't exist, False otherwise
     """
-    filepath = Path(filepath)
-    
-    if not filepath.exists():
-        return True
+    filepath = os.fspath(filepath)
+    attempts = 0
     
     for attempt in range(max_attempts):
+        attempts += 1
+
         try:
-            filepath.unlink()
-            time.sleep(delay)  # Wait for filesystem to sync
-            
-            if not filepath.exists():
-                logger.debug(f"Successfully removed file: {filepath}")
-                return True
-                
-        except Exception as e:
+            os.unlink(filepath)
+            logger.debug(f"Successfully removed file: {filepath}")
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError as e:
             logger.warning(f"Failed to remove file (attempt {attempt + 1}/{max_attempts}): {filepath}. Error: {e}")
+
+            if e.errno not in _TRANSIENT_REMOVE_ERRNOS:
+                break
+
             if attempt < max_attempts - 1:
-                time.sleep(delay)
+                time.sleep(delay * (2 ** attempt))
     
-    logger.error(f"Could not remove file after {max_attempts} attempts: {filepath}")
+    logger.error(f"Could not remove file after {attempts} attempts: {filepath}")
     return False
 
 
-def verify_file_readable(filepath: Union[str, Path], read_size: int = 1024) -> bool:
+def verify_file_readable(filepath: Union[str, Path], read_size: int = 1024, deep: bool = False) -> bool:
     """
     Verify that a file can be opened and read.
     
+    By default this only checks metadata (a non-empty file with read permission),
+    which costs a single stat on network filesystems. Pass ``deep=True`` to also
+    open the file and read from it.
+    
     Parameters
     ----------
     filepath : str or Path
         Path to the file to check
     read_size : int, optional
-        Number of bytes to attempt reading. Defaults to 1024.
+        Number of bytes to attempt reading when ``deep=True``. Defaults to 1024.
+    deep : bool, optional
+        If True, open the file and read ``read_size`` bytes. Defaults to False.
     
     Returns
     -------
     bool
         True if file is readable, False otherwise
     """
-    filepath = Path(filepath)
+    filepath = os.fspath(filepath)
     
     try:
+        if not deep:
+            st = os.stat(filepath)
+            return st.st_size > 0 and os.access(filepath, os.R_OK)
+
         with open(filepath, 'rb') as f:
             _ = f.read(read_size)
         return True
     except Exception as e:
         logger.warning(f"File not readable: {filepath}. Error: {e}")
         return False
+
+
+def advise_file_access(
+    filepath: Union[str, Path],
+    offset: int = 0,
+    length: int = 0,
+    advice: Optional[int] = None
+) -> None:
+    """
+    Give the kernel an access-pattern hint for a byte range of a file.
+    
+    This is a best-effort wrapper around ``os.posix_fadvise`` and does nothing on
+    platforms without it. The default ``POSIX_FADV_WILLNEED`` starts reading the
+    range into the page cache in the background, which benefits any later
+    reader of the file. Note that advice such as ``POSIX_FADV_RANDOM`` only
+    applies to the file descriptor opened here, so it has no lasting effect.
+    
+    Parameters
+    ----------
+    filepath : str or Path
+        Path to the file
+    offset : int, optional
+        Start of the byte range. Defaults to 0.
+    length : int, optional
+        Length of the byte range, or 0 for the rest of the file. Defaults to 0.
+    advice : int, optional
+        One of the ``os.POSIX_FADV_*`` constants. Defaults to ``POSIX_FADV_WILLNEED``.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    if advice is None:
+        advice = os.POSIX_FADV_WILLNEED
+
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+
+        try:
+            os.posix_fadvise(fd, offset, length, advice)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"Could not advise file access for {filepath}: {e}")
+
+
+def _file_signatures(filepaths: Iterable[Union[str, Path]], stats: Optional[dict] = None) -> Optional[dict]:
+    """
+    Collect (size, mtime) signatures for a set of files, or None if any file is missing.
+    """
+    signatures = {}
+
+    for filepath in filepaths:
+        st = stats.get(filepath) if stats else None
+
+        if st is None:
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                return None
+
+        signatures[os.path.basename(filepath)] = [st.st_size, st.st_mtime_ns]
+
+    return signatures
+
+
+def validation_marker_is_current(
+        directory: Union[str, Path],
+        filepaths: Iterable[Union[str, Path]],
+        stats: Optional[dict] = None) -> bool:
+    """
+    Check whether a directory's validation marker matches the current state of its files.
+    
+    The marker records the size and modification time of each file at the time it
+    last passed validation, so an unchanged file does not need to be re-opened and
+    re-validated. Setting the environment variable EMIT_SKIP_VALIDATION_CACHE=1
+    disables the marker and forces full validation.
+    
+    Parameters
+    ----------
+    directory : str or Path
+        Directory containing the files and the marker
+    filepaths : iterable of str or Path
+        Files that must all match the marker
+    stats : dict, optional
+        Mapping of file path to a stat result the caller already has. Files not
+        in the mapping are stat'ed here. Defaults to None.
+    
+    Returns
+    -------
+    bool
+        True if the marker exists and every file's size and mtime match it
+    """
+    if os.environ.get("EMIT_SKIP_VALIDATION_CACHE") == "1":
+        return False
+
+    signatures = _file_signatures(filepaths, stats)
+
+    if signatures is None:
+        return False
+
+    marker = _read_validation_marker(directory)
+
+    return all((marker.get(name) or [])[:2] == signature for name, signature in signatures.items())
+
+
+def _read_validation_marker(directory: Union[str, Path]) -> dict:
+    """
+    Load a directory's validation marker, or an empty mapping if it is missing or unreadable.
+    """
+    try:
+        with open(os.path.join(directory, VALIDATION_MARKER_FILENAME), "r") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return marker if isinstance(marker, dict) else {}
+
+
+def validation_marker_checksum(filepath: Union[str, Path], st: Optional[os.stat_result] = None) -> Optional[str]:
+    """
+    Look up the checksum recorded for a file in its directory's validation marker.
+    
+    The checksum is only returned while the file's size and modification time
+    still match the marker, so a file that has changed since it was recorded is
+    never trusted on the strength of an old digest.
+    
+    Parameters
+    ----------
+    filepath : str or Path
+        File to look up
+    st : os.stat_result, optional
+        Stat result the caller already has for the file. Defaults to None,
+        in which case the file is stat'ed here.
+    
+    Returns
+    -------
+    str or None
+        Checksum as "algorithm:hexdigest", or None if none is recorded or the
+        file no longer matches the marker
+    """
+    if os.environ.get("EMIT_SKIP_VALIDATION_CACHE") == "1":
+        return None
+
+    filepath = os.fspath(filepath)
+
+    if st is None:
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+
+    entry = _read_validation_marker(os.path.dirname(filepath)).get(os.path.basename(filepath))
+
+    if not entry or len(entry) < 3 or entry[:2] != [st.st_size, st.st_mtime_ns]:
+        return None
+
+    return entry[2]
+
+
+def write_validation_marker(
+        directory: Union[str, Path],
+        filepaths: Iterable[Union[str, Path]],
+        checksum_filepaths: Iterable[Union[str, Path]] = ()) -> None:
+    """
+    Record the size and modification time of files that have just passed validation.
+    
+    Files listed in checksum_filepaths also get a fast checksum recorded alongside
+    their signature, which cache maintenance can later verify to catch damage the
+    structural validation misses. They are only checksummed when blake3 or xxhash
+    is installed. Other files keep any checksum the previous marker held for them,
+    as long as they have not changed since.
+    
+    Failure to write the marker is logged and otherwise ignored, since it only
+    means the files will be validated again next time.
+    
+    Parameters
+    ----------
+    directory : str or Path
+        Directory containing the files, where the marker is written
+    filepaths : iterable of str or Path
+        Files that passed validation
+    checksum_filepaths : iterable of str or Path, optional
+        Subset of filepaths to checksum, typically the files that were just
+        downloaded and are still in the page cache. Defaults to none.
+    """
+    if os.environ.get("EMIT_SKIP_VALIDATION_CACHE") == "1":
+        return
+
+    signatures = _file_signatures(filepaths)
+
+    if signatures is None:
+        return
+
+    previous = _read_validation_marker(directory)
+
+    for name, signature in signatures.items():
+        entry = previous.get(name)
+
+        if entry and len(entry) >= 3 and entry[:2] == signature:
+            signature.append(entry[2])
+
+    algorithm = fast_checksum_algorithm()
+
+    if algorithm is None:
+        checksum_filepaths = ()
+
+    for filepath in checksum_filepaths:
+        signature = signatures.get(os.path.basename(filepath))
+
+        if signature is None:
+            continue
+
+        try:
+            signature[2:] = [f"{algorithm}:{compute_file_checksum(filepath, algorithm)}"]
+        except OSError as e:
+            logger.debug(f"Could not checksum {filepath}: {e}")
+
+    try:
+        with open(os.path.join(directory, VALIDATION_MARKER_FILENAME), "w") as f:
+            json.dump(signatures, f)
+    except OSError as e:
+        logger.warning(f"Could not write validation marker in {directory}: {e}")
@@ -1,6 +1,8 @@
-from typing import Union, List
+from typing import Union, List, Optional
 import os
+from collections import defaultdict
 from datetime import date
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from rasters import RasterGeometry
 import logging
@@ -9,7 +11,9 @@ import gc
 
 from .constants import *
 from .exceptions import *
-from .retrieve_EMIT_L2A_RFL import retrieve_EMIT_L2A_RFL
+from .granule_dates import granule_dates
+from .search_EMIT_L2A_RFL_granules import search_EMIT_L2A_RFL_granules
+from .retrieve_EMIT_L2A_RFL import _retrieve_EMIT_L2A_RFL_from_granules
 
 logger = logging.getLogger(__name__)
 
@@ -21,29 +25,55 @@ def generate_EMIT_L2A_RFL_timeseries(
         download_directory: str = DOWNLOAD_DIRECTORY,
         max_retries: int = 3,
         retry_delay: float = 2.0,
-        threads: int = 1) -> List[str]:
+        threads: int = 1,
+        search_results: Optional[list] = None,
+        date_threads: int = 1) -> List[str]:
     logger.info(f"generating EMIT L2A RFL timeseries from {start_date_UTC} to {end_date_UTC}")
     
-    filenames = []
+    def _output_filename(date_UTC: pd.Timestamp) -> str:
+        return os.path.join(
+            output_directory,
+            f"EMIT_L2A_RFL_{date_UTC.strftime('%Y%m%d')}.tif"
+        )
+    
+    dates = pd.date_range(start=start_date_UTC, end=end_date_UTC)
+    pending_dates = [
+        date_UTC
+        for date_UTC in dates
+        if not exists(abspath(expanduser(_output_filename(date_UTC))))
+    ]
+    
+    # search the whole pending range once and bucket granules by every date they
+    # overlap, unless the caller already searched a range covering this one
+    granules_by_date = defaultdict(list)
     
-    # iterate through dates
-    for date_UTC in pd.date_range(start=start_date_UTC, end=end_date_UTC):
+    if pending_dates and search_results is None:
+        search_results = search_EMIT_L2A_RFL_granules(
+            start_UTC=pending_dates[0].date(),
+            end_UTC=pending_dates[-1].date(),
+            geometry=geometry
+        )
+    
+    if pending_dates:
+        for search_result in search_results:
+            # a scene crossing 00:00 UTC goes into both days' mosaics
+            for acquisition_date in granule_dates(search_result):
+                granules_by_date[acquisition_date].append(search_result)
+    
+    def _process_date(date_UTC: pd.Timestamp) -> Optional[str]:
         logger.info(f"processing date: {date_UTC}")
         
         # generate output filename
-        output_filename = os.path.join(
-            output_directory,
-            f"EMIT_L2A_RFL_{date_UTC.strftime('%Y%m%d')}.tif"
-        )
+        output_filename = _output_filename(date_UTC)
         
         if exists(abspath(expanduser(output_filename))):
             logger.info(f"output file already exists: {output_filename}")
-            filenames.append(output_filename)
-            continue
+            return output_filename
         
         try:
             # retrieve data for date
-            merged_cube = retrieve_EMIT_L2A_RFL(
+            merged_cube = _retrieve_EMIT_L2A_RFL_from_granules(
+                search_results=granules_by_date.get(date_UTC.date(), []),
                 date_UTC=date_UTC,
                 geometry=geometry,
                 download_directory=download_directory,
@@ -51,18 +81,37 @@ def generate_EMIT_L2A_RFL_timeseries(
                 retry_delay=retry_delay,
                 threads=threads
             )
-            
-            logger.info(f"saving merged cube: {output_filename}")
-            # save merged cube to file
-            filenames.append(output_filename)
-            merged_cube.to_geotiff(output_filename)
-            
-            # Explicitly clean up to free memory
-            del merged_cube
-            gc.collect()
-            
         except EMITNotAvailable as e:
             logger.info(f"no EMIT granules available for date {date_UTC}")
-            continue
+            return None
+        
+        logger.info(f"saving merged cube: {output_filename}")
+        # save merged cube to file
+        merged_cube.to_geotiff(output_filename)
+        
+        # Explicitly clean up to free memory
+        del merged_cube
+        gc.collect()
+        
+        return output_filename
+    
+    # Dates run one at a time unless date_threads asks for more. Each date in flight holds
+    # its own mosaic in memory and downloads up to `threads` granules, so the two knobs
+    # multiply - raise date_threads only where memory and bandwidth allow.
+    if date_threads <= 1:
+        filenames = [_process_date(date_UTC) for date_UTC in dates]
+    else:
+        with ThreadPoolExecutor(max_workers=date_threads) as executor:
+            futures = [executor.submit(_process_date, date_UTC) for date_UTC in dates]
+            
+            try:
+                # collected in date order
+                filenames = [future.result() for future in futures]
+            except BaseException:
+                # don't start the remaining dates once one has failed
+                for future in futures:
+                    future.cancel()
+                
+                raise
     
-    return filenames
+    return [filename for filename in filenames if filename is not None]
@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+import earthaccess
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .constants import DOWNLOAD_RETRY_STATUS_CODES, DOWNLOAD_SESSION_CONNECTIONS
+
+
+@lru_cache(maxsize=None)
+def get_download_session(connections: int = DOWNLOAD_SESSION_CONNECTIONS) -> requests.Session:
+    """
+    Get the process-wide authenticated HTTPS session used for ranged downloads.
+
+    The session is created from the current earthaccess login on first use and
+    then shared by every granule retrieval in the process, so consecutive
+    retrievals reuse open connections instead of repeating the TLS handshake and
+    Earthdata redirects for each file. Requests that fail with a transient
+    status are retried with exponential backoff.
+
+    Parameters
+    ----------
+    connections : int, optional
+        Number of connections kept open per host. Defaults to
+        DOWNLOAD_SESSION_CONNECTIONS.
+
+    Returns
+    -------
+    requests.Session
+        Shared session for this connection count
+
+    Notes
+    -----
+    Call `earthaccess.login()` before the first download. After logging in as
+    a different user, call `get_download_session.cache_clear()` so the next
+    session picks up the new credentials.
+    """
+    session = earthaccess.get_requests_https_session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=connections,
+        pool_maxsize=connections,
+        max_retries=Retry(total=5, backoff_factor=1.5, status_forcelist=DOWNLOAD_RETRY_STATUS_CODES)
+    ))
+
+    return session
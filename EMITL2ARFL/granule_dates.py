@@ -0,0 +1,28 @@
+from typing import List
+from datetime import date, timedelta
+
+from dateutil import parser
+
+def granule_dates(search_result: dict) -> List[date]:
+    """
+    List every UTC date a granule's acquisition overlaps.
+
+    A single-date search matches granules by temporal overlap with that day, so a
+    scene that crosses 00:00 UTC belongs to both days. Bucketing the results of a
+    range search by these dates keeps it consistent with the single-date search.
+
+    Parameters:
+    search_result (dict): A CMR search result with a UMM TemporalExtent.
+
+    Returns:
+    List[date]: The dates from the granule's beginning to its ending date/time, in order.
+    """
+    range_date_time = search_result["umm"]["TemporalExtent"]["RangeDateTime"]
+    beginning_date = parser.parse(range_date_time["BeginningDateTime"]).date()
+    ending_date_time = range_date_time.get("EndingDateTime")
+    ending_date = parser.parse(ending_date_time).date() if ending_date_time else beginning_date
+
+    return [
+        beginning_date + timedelta(days=offset)
+        for offset in range((ending_date - beginning_date).days + 1)
+    ]
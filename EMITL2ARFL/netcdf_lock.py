@@ -0,0 +1,12 @@
+import threading
+
+# netCDF-C is not thread-safe, and netCDF4-python releases the GIL around its calls, so
+# every netCDF4 open, read and close in this package holds NETCDF_LOCK. It is xarray's
+# own netCDF-C lock where available, so these calls also serialize with the reads
+# xarray makes through its netcdf4 engine (e.g. read_qmask). The lock is not
+# reentrant - take it only around the netCDF4 calls themselves, never around code
+# that may take it again.
+try:
+    from xarray.backends.locks import NETCDFC_LOCK as NETCDF_LOCK
+except ImportError:
+    NETCDF_LOCK = threading.Lock()
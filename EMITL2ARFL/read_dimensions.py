@@ -1,5 +1,7 @@
 import netCDF4
 
+from .netcdf_lock import NETCDF_LOCK
+
 def read_dimensions(filename: str) -> dict[str, int]:
     """
     Read the dimensions from a NetCDF file and return a dictionary mapping
@@ -11,5 +13,5 @@ def read_dimensions(filename: str) -> dict[str, int]:
     Returns:
         dict[str, int]: Dictionary where keys are dimension names and values are sizes.
     """
-    with netCDF4.Dataset(filename, 'r') as ds:
+    with NETCDF_LOCK, netCDF4.Dataset(filename, 'r') as ds:
         return {dim_name: len(dim) for dim_name, dim in ds.dimensions.items()}
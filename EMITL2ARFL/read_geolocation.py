@@ -3,9 +3,13 @@ from .read_latitude_array import read_latitude_array
 from .read_longitude_array import read_longitude_array
 
 from typing import Optional
+import netCDF4
 from rasterio.windows import Window
 
-def read_geolocation(filename: str, window: Optional[Window] = None) -> RasterGeolocation:
+def read_geolocation(
+        filename: str,
+        window: Optional[Window] = None,
+        dataset: Optional[netCDF4.Dataset] = None) -> RasterGeolocation:
     """
     Reads the latitude and longitude arrays from a NetCDF reflectance file and constructs a RasterGeolocation object.
 
@@ -18,14 +22,16 @@ def read_geolocation(filename: str, window: Optional[Window] = None) -> RasterGe
         window (Optional[rasterio.windows.Window], optional):
             If provided, a rasterio Window object specifying the subset (window) of the latitude and longitude arrays to read.
             The window must have attributes row_off, col_off, height, and width. If None, the entire arrays are read.
+        dataset (Optional[netCDF4.Dataset], optional):
+            If provided, an already open dataset for `filename` to read both arrays from, instead of opening the file twice.
 
     Returns:
         RasterGeolocation: An object containing the longitude (x) and latitude (y) arrays for georeferencing.
     """
     # Read the latitude array from the NetCDF file using the helper function
-    lat = read_latitude_array(filename, window=window)
+    lat = read_latitude_array(filename, window=window, dataset=dataset)
     # Read the longitude array from the NetCDF file using the helper function
-    lon = read_longitude_array(filename, window=window)
+    lon = read_longitude_array(filename, window=window, dataset=dataset)
     # Create a RasterGeolocation object using the longitude and latitude arrays
     geolocation = RasterGeolocation(x=lon, y=lat)
 
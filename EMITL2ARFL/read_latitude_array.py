@@ -1,9 +1,13 @@
 from typing import Optional
+import netCDF4
 import numpy as np
 from rasterio.windows import Window
 from .read_netcdf_array import read_netcdf_array
 
-def read_latitude_array(filename: str, window: Optional[Window] = None) -> np.ndarray:
+def read_latitude_array(
+        filename: str,
+        window: Optional[Window] = None,
+        dataset: Optional[netCDF4.Dataset] = None) -> np.ndarray:
     """
     Read the `lat` array from the `location` group in the reflectance NetCDF file.
 
@@ -13,6 +17,8 @@ def read_latitude_array(filename: str, window: Optional[Window] = None) -> np.nd
         Path to the NetCDF file.
     window : Optional[Window], default None
         If provided, only the subset defined by the window will be read.
+    dataset : Optional[netCDF4.Dataset], default None
+        If provided, an already open dataset for `filename` to read from.
 
     Returns
     -------
@@ -23,5 +29,6 @@ def read_latitude_array(filename: str, window: Optional[Window] = None) -> np.nd
         filename=filename,
         variable="lat",
         group="location",
-        window=window
+        window=window,
+        dataset=dataset
     )
@@ -1,10 +1,14 @@
 
 from typing import Optional
+import netCDF4
 import numpy as np
 from rasterio.windows import Window
 from .read_netcdf_array import read_netcdf_array
 
-def read_longitude_array(filename: str, window: Optional[Window] = None) -> np.ndarray:
+def read_longitude_array(
+        filename: str,
+        window: Optional[Window] = None,
+        dataset: Optional[netCDF4.Dataset] = None) -> np.ndarray:
     """
     Read the `lon` array from the `location` group in the reflectance NetCDF file.
 
@@ -14,6 +18,8 @@ def read_longitude_array(filename: str, window: Optional[Window] = None) -> np.n
         Path to the NetCDF file.
     window : Optional[Window], default None
         If provided, only the subset defined by the window will be read.
+    dataset : Optional[netCDF4.Dataset], default None
+        If provided, an already open dataset for `filename` to read from.
 
     Returns
     -------
@@ -24,5 +30,6 @@ def read_longitude_array(filename: str, window: Optional[Window] = None) -> np.n
         filename=filename,
         group="location",
         variable="lon",
-        window=window
+        window=window,
+        dataset=dataset
     )
@@ -1,14 +1,18 @@
 
+from contextlib import nullcontext
 from typing import Optional
 import netCDF4
 import numpy as np
 from rasterio.windows import Window
 
+from .netcdf_lock import NETCDF_LOCK
+
 def read_netcdf_array(
     filename: str,
     variable: str,
     group: Optional[str] = None,
-    window: Optional[Window] = None
+    window: Optional[Window] = None,
+    dataset: Optional[netCDF4.Dataset] = None
 ) -> np.ndarray:
     """
     Read a variable array from a specified group or the root in a NetCDF file.
@@ -24,6 +28,8 @@ def read_netcdf_array(
     window : Optional[rasterio.windows.Window], default None
         If provided, must be a rasterio Window object specifying the subset (window) to read.
         The window must have attributes row_off, col_off, height, and width.
+    dataset : Optional[netCDF4.Dataset], default None
+        If provided, an already open dataset for `filename` to read from. It is left open.
 
     Returns
     -------
@@ -37,8 +43,9 @@ def read_netcdf_array(
     AttributeError
         If the window object does not have the required attributes.
     """
-    # Open the NetCDF file for reading
-    with netCDF4.Dataset(filename, "r") as ds:
+    # Open the NetCDF file for reading, unless the caller already has it open. netCDF-C
+    # isn't thread-safe, so the lock is held from the open through the read and close.
+    with NETCDF_LOCK, nullcontext(dataset) if dataset is not None else netCDF4.Dataset(filename, "r") as ds:
         # Access the specified group and variable, or root if group is None
         if group is None:
             var = ds.variables[variable]
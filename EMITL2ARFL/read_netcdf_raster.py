@@ -1,5 +1,6 @@
 from typing import List
 
+import netCDF4
 import numpy as np
 from typing import Optional
 from rasterio.windows import Window
@@ -19,7 +20,8 @@ def read_netcdf_raster(
     geometry: Optional[RasterGeometry] = None,
     swath_window: Optional[Window] = None,
     qmask: Optional[np.ndarray] = None,
-    resampling: str = "nearest"
+    resampling: str = "nearest",
+    dataset: Optional[netCDF4.Dataset] = None
 ) -> Raster:
     """
     Read a variable array from a NetCDF file and return as a rasters.Raster object with geolocation, supporting spatial subsetting.
@@ -38,6 +40,8 @@ def read_netcdf_raster(
         If provided, must be a rasterio Window object specifying the spatial subset (window) to read. Takes precedence over geometry.
     resampling : str, default "nearest"
         Resampling method to use if geometry is provided and a reprojection or resampling is needed.
+    dataset : Optional[netCDF4.Dataset], default None
+        If provided, an already open dataset for `filename` used for every read instead of reopening the file.
 
     Returns
     -------
@@ -47,7 +51,7 @@ def read_netcdf_raster(
     # If a window is not provided but a geometry is, compute the window from the geometry
     if swath_window is None and geometry is not None:
         # read the scene geolocation
-        geolocation = read_geolocation(filename=filename)
+        geolocation = read_geolocation(filename=filename, dataset=dataset)
 
         # calculate the indices window that covers the target geometry
         swath_window = geolocation.window(geometry)
@@ -57,7 +61,8 @@ def read_netcdf_raster(
         filename=filename,
         variable=variable,
         group=group,
-        window=swath_window
+        window=swath_window,
+        dataset=dataset
     )
 
     if qmask is not None:
@@ -65,7 +70,7 @@ def read_netcdf_raster(
         array = apply_qmask(array=array, qmask=qmask)
 
     # Read the geolocation, using the same window for spatial alignment
-    geolocation = read_geolocation(filename, window=swath_window)
+    geolocation = read_geolocation(filename, window=swath_window, dataset=dataset)
 
     # Wrap the data array and geolocation in a Raster object
     raster = MultiRaster(array, geometry=geolocation)
@@ -1,9 +1,14 @@
-from typing import Union
+from typing import Iterable, Iterator, List, Optional, Union
 from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import gc
 
+import earthaccess
+import numpy as np
+
 import rasters as rt
-from rasters import MultiRaster, Point, Polygon, RasterGeometry
+from rasters import MultiRaster, Point, Polygon, RasterGeometry, RasterGrid
 import logging
 
 from .constants import *
@@ -13,6 +18,47 @@ from .retrieve_EMIT_L2A_RFL_granule import retrieve_EMIT_L2A_RFL_granule
 
 logger = logging.getLogger(__name__)
 
+class _SearchGeometry:
+    """
+    Hashable wrapper so a search geometry can be part of an lru_cache key.
+
+    The key is built from what defines the searched area - the coordinates of a
+    point or polygon, or the bounds and shape of a raster grid - along with the
+    CRS. Other geometries, such as swath geolocation arrays, get a key of None
+    and are not cached.
+    """
+    def __init__(self, geometry: Union[Point, Polygon, RasterGeometry]) -> None:
+        self.geometry = geometry
+
+        if isinstance(geometry, (Point, Polygon)):
+            self.key = (type(geometry).__name__, geometry.wkt, str(geometry.crs))
+        elif isinstance(geometry, RasterGrid):
+            bbox = geometry.bbox
+            self.key = (
+                type(geometry).__name__,
+                (bbox.x_min, bbox.y_min, bbox.x_max, bbox.y_max),
+                tuple(geometry.shape),
+                str(geometry.crs)
+            )
+        else:
+            self.key = None
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _SearchGeometry) and self.key == other.key
+
+@lru_cache(maxsize=256)
+def _search_EMIT_L2A_RFL_granules_cached(
+        date_key: str,
+        search_geometry: _SearchGeometry) -> List[earthaccess.search.DataGranule]:
+    return search_EMIT_L2A_RFL_granules(
+        start_UTC=date_key,
+        end_UTC=date_key,
+        geometry=search_geometry.geometry
+    )
+
 def retrieve_EMIT_L2A_RFL(
         date_UTC: Union[date, datetime, str],
         geometry: Union[Point, Polygon, RasterGeometry],
@@ -20,43 +66,118 @@ def retrieve_EMIT_L2A_RFL(
         max_retries: int = 3,
         retry_delay: float = 2.0,
         threads: int = 1) -> MultiRaster:
-    search_results = search_EMIT_L2A_RFL_granules(
-        start_UTC=date_UTC,
-        end_UTC=date_UTC,
-        geometry=geometry
+    # repeated (date, geometry) searches within a session are served from cache
+    search_geometry = _SearchGeometry(geometry)
+
+    if search_geometry.key is None:
+        search_results = search_EMIT_L2A_RFL_granules(
+            start_UTC=str(date_UTC),
+            end_UTC=str(date_UTC),
+            geometry=geometry
+        )
+    else:
+        search_results = list(_search_EMIT_L2A_RFL_granules_cached(str(date_UTC), search_geometry))
+
+    return _retrieve_EMIT_L2A_RFL_from_granules(
+        search_results=search_results,
+        date_UTC=date_UTC,
+        geometry=geometry,
+        download_directory=download_directory,
+        max_retries=max_retries,
+        retry_delay=retry_delay,
+        threads=threads
     )
-    
+
+retrieve_EMIT_L2A_RFL.cache_clear = _search_EMIT_L2A_RFL_granules_cached.cache_clear
+
+def _mosaic_incrementally(
+        cubes: Iterable[MultiRaster],
+        geometry: RasterGeometry,
+        resampling: str = "nearest") -> Optional[MultiRaster]:
+    """
+    Mosaic cubes onto a geometry as they arrive, earlier cubes taking precedence.
+
+    This overlays the same way as `rt.mosaic`, which needs a sequence it can
+    take the length of and index, so it can't consume a generator. Here only
+    the running mosaic and the cube being overlaid are held in memory.
+    Returns None if `cubes` yields nothing.
+    """
+    mosaic = None
+
+    # The only warnings expected here are numpy's invalid-value warnings for NaN fill
+    # (comparisons, and the final cast). np.errstate silences just those, and unlike
+    # warnings.catch_warnings it is local to the calling thread, so concurrent dates
+    # (generate_EMIT_L2A_RFL_timeseries' date_threads) don't clobber each other's filters.
+    with np.errstate(invalid="ignore"):
+        for cube in cubes:
+            projected = cube.to_geometry(geometry, resampling=resampling)
+
+            if mosaic is None:
+                mosaic = projected
+            else:
+                mosaic = rt.where(np.isnan(mosaic), projected, mosaic)
+
+            # rt.mosaic takes these from the last image overlaid
+            dtype, nodata, metadata = cube.dtype, cube.nodata, cube.metadata
+            del cube, projected
+
+        if mosaic is None:
+            return None
+
+        return MultiRaster(mosaic.astype(dtype), geometry=geometry, nodata=nodata, metadata=metadata)
+
+def _retrieve_EMIT_L2A_RFL_from_granules(
+        search_results: List[earthaccess.search.DataGranule],
+        date_UTC: Union[date, datetime, str],
+        geometry: Union[Point, Polygon, RasterGeometry],
+        download_directory: str = DOWNLOAD_DIRECTORY,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        threads: int = 1) -> MultiRaster:
     if len(search_results) == 0:
         raise EMITNotAvailable(f"No EMIT L2A RFL granules found for date {date_UTC} and specified geometry.")
     
     logger.info(f"found {len(search_results)} granules for date {date_UTC}")
     
-    # Process granules one at a time to minimize memory usage
-    subset_cubes = []
-    for search_result in search_results:
-        try:
-            granule = retrieve_EMIT_L2A_RFL_granule(
+    # Download granules concurrently (network-bound), then subset them one at a time
+    # in search order to keep the mosaic order deterministic
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        futures = [
+            executor.submit(
+                retrieve_EMIT_L2A_RFL_granule,
                 remote_granule=search_result,
                 download_directory=download_directory,
                 max_retries=max_retries,
                 retry_delay=retry_delay,
                 threads=threads
             )
-            subset_cube = granule.reflectance(geometry=geometry)
-            subset_cubes.append(subset_cube)
-            # Clean up granule object immediately
-            del granule
-        except Exception as e:
-            logger.warning(f"Failed to process granule: {e}")
-            continue
+            for search_result in search_results
+        ]
+
+        def _subset_cubes() -> Iterator[MultiRaster]:
+            # Yield one subset at a time so only the cube currently being
+            # merged is held in memory alongside the running mosaic
+            for future in futures:
+                try:
+                    # the granule keeps its reflectance file open across reads, closed on leaving the block
+                    with future.result() as granule:
+                        subset_cube = granule.reflectance(geometry=geometry)
+                    
+                    # Clean up granule object immediately
+                    del granule
+                except Exception as e:
+                    logger.warning(f"Failed to process granule: {e}")
+                    continue
+
+                yield subset_cube
+                del subset_cube
+                gc.collect()
+
+        merged_cube = _mosaic_incrementally(_subset_cubes(), geometry=geometry)
     
-    if not subset_cubes:
+    if merged_cube is None:
         raise EMITNotAvailable(f"No valid EMIT L2A RFL data retrieved for date {date_UTC}")
     
-    merged_cube = rt.mosaic(subset_cubes, geometry=geometry)
-    
-    # Clean up subset cubes before returning
-    del subset_cubes
     gc.collect()
 
     return merged_cube
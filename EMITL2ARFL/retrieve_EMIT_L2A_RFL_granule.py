@@ -1,21 +1,65 @@
+import atexit
 import posixpath
 import logging
+import random
+import re
+import threading
 import time
-from os import remove, sync
-from os.path import join, expanduser, abspath, exists
-from typing import List, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+import os
+from os.path import join, expanduser, abspath
+from typing import List, Optional, Tuple
 
 import earthaccess
 
 from .constants import *
 from .EMITL2ARFLGranule import EMITL2ARFLGranule
+from .download_file_ranges import download_file_ranges
 from .find_EMIT_L2A_RFL_granule import find_EMIT_L2A_RFL_granule
-from .validate_NetCDF_file import validate_NetCDF_file
-from .exceptions import NetCDFValidationError
-from .file_utils import safe_file_remove, wait_for_file_stability
+from .get_download_session import get_download_session
+from .validate_NetCDF_files import validate_NetCDF_files
+from .exceptions import NetCDFFileNotFoundError
+from .file_utils import (
+    safe_file_remove,
+    wait_for_file_stability,
+    validation_marker_is_current,
+    write_validation_marker
+)
 
 logger = logging.getLogger(__name__)
 
+# Product tags in the order the granule files are returned: reflectance, mask, uncertainty
+FILE_TYPES = ('RFL', 'MASK', 'RFLUNCERT')
+FILE_TYPE_PATTERN = re.compile(r'_(' + '|'.join(FILE_TYPES) + r')_')
+
+# Shared by every granule retrieval so back-to-back retrievals don't create and join threads each time
+_DOWNLOAD_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="emit-dl")
+
+def _shutdown_download_pool() -> None:
+    _DOWNLOAD_POOL.shutdown(wait=False)
+
+atexit.register(_shutdown_download_pool)
+
+def set_download_pool(pool: Executor) -> Executor:
+    """
+    Replace the executor used for per-file downloads, returning the previous one.
+
+    The caller owns the previous executor and is responsible for shutting it down.
+    Useful for sizing the pool for a pipeline or for isolating tests.
+    """
+    global _DOWNLOAD_POOL
+    previous_pool = _DOWNLOAD_POOL
+    _DOWNLOAD_POOL = pool
+
+    return previous_pool
+
+def _stat_or_none(filepath: str) -> Optional[os.stat_result]:
+    """Stat a file, returning None if it does not exist."""
+    try:
+        return os.stat(filepath)
+    except FileNotFoundError:
+        return None
+
 def retrieve_EMIT_L2A_RFL_granule(
         remote_granule: earthaccess.search.DataGranule = None,
         orbit: int = None,
@@ -25,7 +69,8 @@ def retrieve_EMIT_L2A_RFL_granule(
         retry_delay: float = 2.0,
         skip_validation: bool = False,
         threads: int = 1,
-        use_wget: bool = False) -> EMITL2ARFLGranule:
+        use_wget: bool = False,
+        range_segments: int = 1) -> EMITL2ARFLGranule:
     """
     Retrieve an EMIT L2A Reflectance granule with resilient error handling and retry logic.
 
@@ -40,7 +85,8 @@ def retrieve_EMIT_L2A_RFL_granule(
         scene (int, optional): The scene number to search for the granule. Defaults to None.
         download_directory (str, optional): The directory to download the granule files to. Defaults to DOWNLOAD_DIRECTORY.
         max_retries (int, optional): Maximum number of retry attempts for downloading corrupted files. Defaults to 3.
-        retry_delay (float, optional): Seconds to wait between retry attempts. Useful for HPC environments. Defaults to 2.0.
+        retry_delay (float, optional): Base seconds to wait before re-downloading a file. Doubles with each retry of
+            that file (capped at 30 seconds) with random jitter. Useful for HPC environments. Defaults to 2.0.
         skip_validation (bool, optional): If True, skip NetCDF validation (use with caution). Defaults to False.
             Only use this if you're experiencing persistent corruption and want to attempt processing anyway.
         threads (int, optional): Number of parallel download threads. Defaults to 1 (single-threaded) for maximum
@@ -48,6 +94,10 @@ def retrieve_EMIT_L2A_RFL_granule(
         use_wget (bool, optional): If True, use wget command-line tool for downloading. If False (default), use 
             earthaccess.download(). Note: wget approach is currently not implemented for NASA Earthdata authentication.
             This parameter is reserved for future use.
+        range_segments (int, optional): Number of byte ranges to fetch concurrently for each file. Defaults to 1,
+            which downloads each file as a single stream with earthaccess.download(). Values above 1 download through
+            the shared pooled, authenticated HTTPS session from get_download_session(), splitting each file into that
+            many parallel ranged requests - much faster for multi-GB granules on a fast link.
 
     Returns:
         EMITL2ARFLGranule: The retrieved EMIT L2A Reflectance granule wrapped in an EMITL2ARFLGranule object.
@@ -55,7 +105,6 @@ def retrieve_EMIT_L2A_RFL_granule(
     Raises:
         ValueError: If no granule is found for the provided orbit and scene, or if the provided granule is not an EMIT L2A Reflectance collection 1 granule.
         FileNotFoundError: If required files cannot be downloaded after max_retries attempts.
-        RuntimeError: If use_wget=True but wget is not available on the system.
     """
     if remote_granule is None and orbit is not None and scene is not None:
         remote_granule = find_EMIT_L2A_RFL_granule(granule=remote_granule, orbit=orbit, scene=scene)
@@ -63,143 +112,237 @@ def retrieve_EMIT_L2A_RFL_granule(
     if remote_granule is None:
         raise ValueError("either granule or orbit and scene must be provided")
 
+    # Fetch the data links once - they are reused for paths, logging and retries
+    data_links = list(remote_granule.data_links())
+
     # Parse granule ID from the first data link
-    granule_ID = posixpath.splitext(posixpath.basename(remote_granule.data_links()[0]))[0]
+    granule_ID = posixpath.splitext(posixpath.basename(data_links[0]))[0]
 
-    # Validate that this is an EMIT L2A Reflectance collection 1 granule
+    # Validate that this is an EMIT L2A Reflectance collection 1 granule before doing any path work
     if not granule_ID.startswith("EMIT_L2A_RFL_001_"):
         raise ValueError("The provided granule is not an EMIT L2A Reflectance collection 1 granule.")
 
+    url_by_basename = {posixpath.basename(URL): URL for URL in data_links}
+
     # Set up the granule directory
     directory = join(download_directory, granule_ID)
     abs_directory = abspath(expanduser(directory))
     
     # Get expected filenames from the remote granule
-    base_filenames = [posixpath.basename(URL) for URL in remote_granule.data_links()]
+    base_filenames = list(url_by_basename)
     local_files = [join(abs_directory, fname) for fname in base_filenames]
     
     # Log the URLs that will be checked/downloaded
     logger.info(f"Granule URLs:")
-    for i, url in enumerate(remote_granule.data_links(), 1):
-        logger.info(f"  [{i}/{len(remote_granule.data_links())}] {url}")
+    for i, url in enumerate(data_links, 1):
+        logger.info("  [%d/%d] %s", i, len(data_links), url)
     
     # Helper function to identify file types
-    def _identify_files(files: List[str]) -> tuple[Optional[str], Optional[str], Optional[str]]:
-        """Identify RFL, MASK, and RFLUNCERT files from a list of filenames."""
-        reflectance = next((f for f in files if '_RFL_' in f and '_RFLUNCERT_' not in f), None)
-        mask = next((f for f in files if '_MASK_' in f), None)
-        uncertainty = next((f for f in files if '_RFLUNCERT_' in f), None)
-        return reflectance, mask, uncertainty
+    def _identify_files(pairs: List[Tuple[str, str]]) -> tuple[Optional[str], Optional[str], Optional[str]]:
+        """Identify RFL, MASK, and RFLUNCERT files from (path, basename) pairs."""
+        found = {}
+
+        for f, b in pairs:
+            # match on the basename - the granule directory itself contains "_RFL_"
+            match = FILE_TYPE_PATTERN.search(b)
+
+            if match:
+                found.setdefault(match.group(1), f)
+
+                if len(found) == len(FILE_TYPES):
+                    break
+
+        return tuple(found.get(file_type) for file_type in FILE_TYPES)
     
     # Helper function to download specific files
-    def _download_files(urls: List[str], retry_attempt: int = 0) -> bool:
-        """Download files using earthaccess (with optional wget support for future use)."""
+    def _download_file(url: str) -> bool:
+        """
+        Download a single file, backing off first if this file has failed before.
+
+        With a ranged download session (range_segments > 1) the file is fetched in parallel byte
+        ranges with download_file_ranges(); otherwise it is fetched whole with earthaccess.download().
+        """
+        attempt = download_attempts[url]
+        download_attempts[url] += 1
+        
+        if attempt > 0:
+            # Exponential backoff with jitter, per file, so concurrent workers don't retry in lockstep
+            wait_time = min(RETRY_MAX_DELAY, retry_delay * (2 ** (attempt - 1)))
+            wait_time *= 1 + random.uniform(-RETRY_JITTER, RETRY_JITTER)
+            logger.info("Waiting %.1f seconds before retrying %s...", wait_time, posixpath.basename(url))
+            time.sleep(wait_time)
+        
         try:
-            if use_wget:
-                # TODO: Implement wget support with NASA Earthdata authentication
-                # For now, fall back to earthaccess
-                logger.warning("wget download not yet implemented for NASA Earthdata - using earthaccess")
-            
-            # Use earthaccess for downloading (handles NASA authentication)
-            actual_threads = threads
-            logger.info(f"Downloading with earthaccess (attempt {retry_attempt + 1}/{max_retries}, threads={actual_threads})...")
-            logger.info(f"Download directory: {abs_directory}")
-            for i, url in enumerate(urls, 1):
-                logger.info(f"  [{i}/{len(urls)}] {url}")
-            
-            earthaccess.download(urls, local_path=abs_directory, threads=actual_threads)
-            return True
+            if session is not None:
+                download_file_ranges(url, join(abs_directory, posixpath.basename(url)), session, segments=range_segments)
+            else:
+                earthaccess.download([url], local_path=abs_directory, threads=1)
         except Exception as e:
-            logger.error(f"Download failed: {e}")
+            logger.error(f"Download failed for {url}: {e}")
             return False
+        
+        # Flush just this file to stable storage (important for HPC/network filesystems)
+        try:
+            fd = os.open(join(abs_directory, posixpath.basename(url)), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass  # missing files are caught by validation
+        
+        return True
+    
+    def _download_files(urls: List[str], retry_attempt: int = 0) -> List[str]:
+        """Download files concurrently, one task per file, returning the URLs that failed."""
+        if use_wget:
+            logger.warning("wget download not yet implemented for NASA Earthdata - using earthaccess")
+        
+        actual_threads = max(1, min(threads, len(urls)))
+        method = f"{range_segments} ranges per file" if session is not None else "earthaccess"
+        logger.info(f"Downloading with {method} (attempt {retry_attempt + 1}/{max_retries}, threads={actual_threads})...")
+        logger.info(f"Download directory: {abs_directory}")
+        for i, url in enumerate(urls, 1):
+            logger.info("  [%d/%d] %s", i, len(urls), url)
+        
+        if actual_threads == 1:
+            succeeded = [_download_file(url) for url in urls]
+        else:
+            # Independent files download side by side on the shared pool, so one slow file
+            # doesn't gate the others, with at most `threads` of this granule's files in flight
+            slots = threading.BoundedSemaphore(actual_threads)
+
+            def _download_file_in_slot(url: str) -> bool:
+                with slots:
+                    return _download_file(url)
+
+            succeeded = list(_DOWNLOAD_POOL.map(_download_file_in_slot, urls))
+        
+        return [url for url, success in zip(urls, succeeded) if not success]
     
     # Identify expected file paths
-    reflectance_filename, mask_filename, uncertainty_filename = _identify_files(local_files)
+    reflectance_filename, mask_filename, uncertainty_filename = _identify_files(list(zip(local_files, base_filenames)))
     
     if not all([reflectance_filename, mask_filename, uncertainty_filename]):
         raise ValueError('Could not identify all required file types (RFL, MASK, RFLUNCERT) from granule data links.')
     
     # Track which files need to be (re)downloaded
     files_to_download = []
-    file_info = {
-        'reflectance': (reflectance_filename, 'Reflectance'),
-        'mask': (mask_filename, 'Mask'),
-        'uncertainty': (uncertainty_filename, 'Uncertainty')
+    file_types = {
+        reflectance_filename: 'Reflectance',
+        mask_filename: 'Mask',
+        uncertainty_filename: 'Uncertainty'
     }
     
+    # Map local file paths back to remote URLs so retries only fetch the files that need it
+    url_by_local = {
+        join(abs_directory, base_filename): url_by_basename[base_filename]
+        for base_filename in base_filenames
+    }
+    download_attempts = {url: 0 for url in url_by_local.values()}
+    
     # Initial validation check (unless validation is skipped)
-    if not skip_validation:
-        for filepath, file_type in file_info.values():
-            try:
-                validate_NetCDF_file(filepath, file_type=file_type)
-                logger.info(f"Cached file validated successfully: {filepath}")
-            except NetCDFValidationError as e:
+    validated_filenames = [reflectance_filename, mask_filename, uncertainty_filename]
+
+    # Stat each file once and share the result between the marker check and validation
+    file_stats = {filepath: _stat_or_none(filepath) for filepath in validated_filenames}
+    missing_files = [filepath for filepath, st in file_stats.items() if st is None]
+
+    if not skip_validation and validation_marker_is_current(abs_directory, validated_filenames, file_stats):
+        logger.info(f"Cached files unchanged since last validation: {abs_directory}")
+    elif not skip_validation:
+        for filepath in missing_files:
+            logger.info("Cached %s file not found: %s", file_types[filepath], filepath)
+            files_to_download.append(filepath)
+
+        # Cached files get the cheap signature check; fresh downloads get full validation below
+        validation_errors = validate_NetCDF_files(
+            {filepath: file_types[filepath] for filepath in validated_filenames if file_stats[filepath] is not None},
+            deep=False,
+            stats=file_stats
+        )
+
+        for filepath, e in validation_errors.items():
+            if e is None:
+                logger.info("Cached file validated successfully: %s", filepath)
+            else:
                 logger.warning(f"Cached file validation failed: {e}")
                 # Remove corrupted cached file immediately to force re-download
-                if exists(filepath):
+                if not isinstance(e, NetCDFFileNotFoundError):
                     logger.info(f"Removing corrupted cached file: {filepath}")
                     if safe_file_remove(filepath, max_attempts=3):
                         logger.info(f"Corrupted file removed successfully")
                     else:
                         logger.error(f"Could not remove corrupted file - will attempt download anyway")
                 files_to_download.append(filepath)
+
+        if not files_to_download:
+            write_validation_marker(abs_directory, validated_filenames)
     else:
         logger.warning("Validation is SKIPPED - files may be corrupted!")
         # Check if files exist but don't validate them
-        for filepath, file_type in file_info.values():
-            if not exists(filepath):
-                files_to_download.append(filepath)
+        files_to_download.extend(missing_files)
     
+    # Ranged downloads share the process-wide authenticated session, so every range
+    # of every file - in this retrieval and the next - reuses an open connection
+    session = None
+
+    if files_to_download and range_segments > 1:
+        session = get_download_session(max(DOWNLOAD_SESSION_CONNECTIONS, range_segments * len(FILE_TYPES)))
+
     # Retry loop for downloading/repairing files
     retry_count = 0
+    # Files that passed full validation right after download, checksummed for the marker
+    verified_downloads = []
     while files_to_download and retry_count < max_retries:
-        # Wait before retry (except on first attempt)
-        if retry_count > 0:
-            wait_time = retry_delay * (2 ** (retry_count - 1))  # Exponential backoff
-            logger.info(f"Waiting {wait_time:.1f} seconds before retry {retry_count + 1}...")
-            time.sleep(wait_time)
-        
-        # Force filesystem sync (important for HPC/network filesystems)
-        try:
-            sync()
-        except Exception:
-            pass  # sync() may not be available on all systems
-        
-        # Download all files (earthaccess will skip existing valid files)
-        if not _download_files(remote_granule.data_links(), retry_count):
-            retry_count += 1
-            continue
-        
-        # Wait for files to stabilize (important for network filesystems)
-        logger.info("Waiting for downloaded files to stabilize...")
-        for filepath in [reflectance_filename, mask_filename, uncertainty_filename]:
-            if exists(filepath):
-                wait_for_file_stability(filepath, check_interval=0.5, max_checks=6)
+        # Download only the missing or corrupted files
+        failed_urls = set(_download_files([url_by_local[filepath] for filepath in files_to_download], retry_count))
+        downloaded_files = [filepath for filepath in files_to_download if url_by_local[filepath] not in failed_urls]
+        files_to_download = [filepath for filepath in files_to_download if url_by_local[filepath] in failed_urls]
         
-        # Force filesystem sync after download
-        try:
-            sync()
-            time.sleep(0.5)  # Brief pause to ensure file writes complete
-        except Exception:
-            pass
-        
-        # Re-validate files (unless validation is skipped)
-        files_to_download = []
-        if not skip_validation:
-            for filepath, file_type in file_info.values():
-                try:
-                    validate_NetCDF_file(filepath, file_type=file_type)
-                    logger.info(f"Downloaded file validated successfully: {filepath}")
-                except NetCDFValidationError as e:
+        # Re-validate the downloaded files (unless validation is skipped)
+        if not skip_validation and downloaded_files:
+            validation_errors = validate_NetCDF_files(
+                {filepath: file_types[filepath] for filepath in downloaded_files},
+                deep=True,
+                stats={filepath: _stat_or_none(filepath) for filepath in downloaded_files}
+            )
+            
+            # A file that fails right after download may still be settling on a network
+            # filesystem - wait for it to stabilize and give it one more validation
+            unsettled_files = [
+                filepath for filepath, e in validation_errors.items()
+                if e is not None and not isinstance(e, NetCDFFileNotFoundError)
+            ]
+            
+            if unsettled_files:
+                logger.info("Waiting for downloaded files to stabilize...")
+                for filepath in unsettled_files:
+                    wait_for_file_stability(filepath, check_interval=0.5, max_checks=6)
+                
+                validation_errors.update(validate_NetCDF_files(
+                    {filepath: file_types[filepath] for filepath in unsettled_files},
+                    deep=True
+                ))
+
+            for filepath, e in validation_errors.items():
+                if e is None:
+                    logger.info("Downloaded file validated successfully: %s", filepath)
+                    verified_downloads.append(filepath)
+                else:
                     logger.warning(f"Validation failed after download attempt: {e}")
                     # File still corrupted after download - remove it for next retry
-                    if exists(filepath):
+                    if not isinstance(e, NetCDFFileNotFoundError):
                         logger.info(f"Removing still-corrupted file for retry: {filepath}")
                         safe_file_remove(filepath, max_attempts=3)
                     files_to_download.append(filepath)
         
         if not files_to_download:
             logger.info("All files successfully downloaded and validated.")
+
+            if not skip_validation:
+                write_validation_marker(abs_directory, validated_filenames, checksum_filepaths=verified_downloads)
+
             break
         
         retry_count += 1
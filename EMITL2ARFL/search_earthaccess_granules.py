@@ -1,3 +1,4 @@
+import sys
 from typing import Union, List
 from datetime import date, datetime
 
@@ -24,7 +25,7 @@ def search_earthaccess_granules(
     readable_granule_name (str, optional): The search pattern to filter the search. Defaults to None.
 
     Returns:
-    List[earthaccess.search.DataGranule]: A list of data granules matching the search criteria.
+    List[earthaccess.search.DataGranule]: All data granules matching the search criteria, however many pages they span.
     """
     query = generate_earthaccess_query(
         concept_ID=concept_ID,
@@ -34,6 +35,9 @@ def search_earthaccess_granules(
         readable_granule_name=readable_granule_name
     )
 
-    granules = query.get()
+    # earthaccess stops at 2000 granules unless asked for more, which silently drops the
+    # rest of a long search. Page through every result instead - it keeps requesting
+    # CMR search-after pages until one comes back short, and raises if a page fails.
+    granules = query.get(limit=sys.maxsize)
     
     return granules
\ No newline at end of file
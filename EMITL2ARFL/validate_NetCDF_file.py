@@ -1,25 +1,90 @@
-from os.path import expanduser, abspath, exists
+import errno
+import os
 
 import netCDF4
-import hashlib
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
+from .constants import HDF5_SIGNATURE, HDF5_SUPERBLOCK_SIZE, NETCDF_CLASSIC_SIGNATURES, NETCDF_HEADER_PREFETCH_SIZE
+from .file_utils import advise_file_access, compute_file_checksum, fast_checksum_algorithm
+from .netcdf_lock import NETCDF_LOCK
 from .exceptions import (
     NetCDFFileNotFoundError,
     NetCDFEmptyFileError,
     NetCDFCorruptedError,
-    NetCDFReadError
+    NetCDFHDFCorruptionError,
+    NetCDFReadError,
+    NetCDFValidationError
 )
 
+# netCDF-C error code for "NetCDF: HDF error"
+NC_EHDFERR = -101
+
+
+def _hdf5_end_of_file_address(superblock: bytes) -> Optional[int]:
+    """
+    Read the end-of-file address declared in an HDF5 superblock.
+    
+    Returns None if the superblock version or offset size is not recognized,
+    or if the address is undefined.
+    """
+    if len(superblock) < 14:
+        return None
+
+    version = superblock[8]
+
+    if version in (0, 1):
+        # versions 0 and 1: fixed fields, then base, free-space, end-of-file and driver addresses
+        offset_size = superblock[13]
+        base_address_offset = 24 if version == 0 else 28
+    elif version in (2, 3):
+        # versions 2 and 3: fixed fields, then base, extension, end-of-file and root group addresses
+        offset_size = superblock[9]
+        base_address_offset = 12
+    else:
+        return None
+
+    if offset_size not in (2, 4, 8):
+        return None
+
+    end_of_file_address_offset = base_address_offset + 2 * offset_size
+
+    if len(superblock) < end_of_file_address_offset + offset_size:
+        return None
+
+    base_address = int.from_bytes(superblock[base_address_offset:base_address_offset + offset_size], "little")
+    end_of_file_address = int.from_bytes(
+        superblock[end_of_file_address_offset:end_of_file_address_offset + offset_size],
+        "little"
+    )
+
+    if end_of_file_address == (1 << (8 * offset_size)) - 1:
+        return None
+
+    return base_address + end_of_file_address
+
 
-def validate_NetCDF_file(filename: Union[str, Path], file_type: str = "NetCDF", check_integrity: bool = False) -> None:
+def validate_NetCDF_file(
+        filename: Union[str, Path],
+        file_type: str = "NetCDF",
+        check_integrity: bool = False,
+        deep: bool = True,
+        _stat: Optional[os.stat_result] = None) -> None:
     """
     Validate whether a file is a valid NetCDF file.
     
     This function performs comprehensive validation of a NetCDF file, checking for:
     - File existence
     - Non-zero file size
+    - HDF5/NetCDF file signature
+    - HDF5 declared end of file within the actual file size (truncation)
     - NetCDF format validity
     - Readability of dimensions and variables
     - (Optional) File integrity via checksum
@@ -32,8 +97,15 @@ def validate_NetCDF_file(filename: Union[str, Path], file_type: str = "NetCDF",
         Descriptive name for the file type (e.g., "Reflectance", "Mask").
         Used in error messages for better context. Defaults to "NetCDF".
     check_integrity : bool, optional
-        If True, compute file checksum for integrity verification. Defaults to False.
+        If True, also probe variable metadata and stream the whole file through a fast
+        checksum (BLAKE3, xxHash or SHA-256, whichever is available). Defaults to False.
         This is slower but useful for detecting partial downloads or corruption.
+    deep : bool, optional
+        If True, open the file with netCDF4 and check its structure. If False, stop
+        after the cheap existence, size and file signature checks. Defaults to True.
+    _stat : os.stat_result, optional
+        Result of a stat call the caller has already made on this file, so it is
+        not stat'ed again. Defaults to None.
     
     Returns
     -------
@@ -48,6 +120,8 @@ def validate_NetCDF_file(filename: Union[str, Path], file_type: str = "NetCDF",
         If the file exists but has zero bytes (empty file)
     NetCDFCorruptedError
         If the file is corrupted or has invalid NetCDF format
+    NetCDFHDFCorruptionError
+        If the HDF5 layer reports an error, typically from a corrupted download
     NetCDFReadError
         If the file cannot be read due to I/O errors or permission issues
     
@@ -55,63 +129,184 @@ def validate_NetCDF_file(filename: Union[str, Path], file_type: str = "NetCDF",
     --------
     >>> validate_NetCDF_file('data.nc')
     >>> validate_NetCDF_file('reflectance.nc', file_type='Reflectance')
+    >>> validate_NetCDF_file('cached.nc', deep=False)  # signature check only
     >>> validate_NetCDF_file('missing.nc')  # Raises NetCDFFileNotFoundError
     """
-    filename_absolute = Path(abspath(expanduser(filename)))
+    # Absolute Paths (e.g. already resolved by the caller) are used as-is. Otherwise absolute()
+    # only prepends the working directory - unlike resolve() it doesn't stat each component.
+    if isinstance(filename, Path) and filename.is_absolute():
+        filename_absolute = filename
+    else:
+        filename_absolute = Path(filename).expanduser().absolute()
     
-    # Check if file exists
-    if not exists(filename_absolute):
-        raise NetCDFFileNotFoundError(
-            f"{file_type} file does not exist at path: {filename}"
-        )
+    # converted to a string once for every call below
+    filename_absolute = os.fspath(filename_absolute)
+    
+    # Check if file exists - a single stat answers both existence and size
+    file_stat = _stat
+
+    if file_stat is None:
+        try:
+            file_stat = os.stat(filename_absolute)
+        except FileNotFoundError:
+            raise NetCDFFileNotFoundError(
+                f"{file_type} file does not exist at path: {filename}"
+            )
     
     # Check if file is empty
-    file_size = filename_absolute.stat().st_size
+    file_size = file_stat.st_size
     if file_size == 0:
         raise NetCDFEmptyFileError(
             f"{file_type} file is empty (0 bytes): {filename}"
         )
     
-    # Attempt to open and validate NetCDF structure
+    # Check the file signature - this rejects non-NetCDF files from a single small read
     try:
-        with netCDF4.Dataset(filename_absolute, "r") as ds:
-            # Try to access basic attributes to ensure file is readable
-            dimensions = ds.dimensions
-            variables = ds.variables
+        # unbuffered, so only the header is read rather than a whole default-sized buffer
+        with open(filename_absolute, "rb", buffering=0) as f:
+            header = f.read(HDF5_SUPERBLOCK_SIZE)
+    except OSError as e:
+        raise NetCDFReadError(
+            f"{file_type} file cannot be read due to I/O error: {filename}. "
+            f"File size: {file_size} bytes. Error: {e}"
+        )
+    
+    signature = header[:len(HDF5_SIGNATURE)]
+    
+    if signature != HDF5_SIGNATURE and not signature.startswith(NETCDF_CLASSIC_SIGNATURES):
+        raise NetCDFCorruptedError(
+            f"{file_type} file is corrupted or not a NetCDF file (missing HDF5/NetCDF signature): {filename}. "
+            f"File size: {file_size} bytes"
+        )
+    
+    # A truncated download keeps its superblock but ends before the declared end of file
+    if signature == HDF5_SIGNATURE:
+        end_of_file_address = _hdf5_end_of_file_address(header)
+
+        if end_of_file_address is not None and end_of_file_address > file_size:
+            raise NetCDFCorruptedError(
+                f"{file_type} file is truncated (possibly an incomplete download): {filename}. "
+                f"Declared end of file: {end_of_file_address} bytes, file size: {file_size} bytes"
+            )
+    
+    if not deep:
+        return
+    
+    # Files that already passed deep validation and haven't changed since are not re-opened
+    _validate_NetCDF_structure(
+        filename,
+        filename_absolute,
+        file_type,
+        check_integrity,
+        file_size,
+        file_stat.st_mtime_ns,
+        signature == HDF5_SIGNATURE
+    )
+
+
+def is_valid_NetCDF_file(filename: Union[str, Path], **kwargs) -> bool:
+    """
+    Check whether a file is a valid NetCDF file without raising.
+    
+    Parameters
+    ----------
+    filename : str or Path
+        Path to the NetCDF file to validate
+    **kwargs
+        Passed through to `validate_NetCDF_file`
+    
+    Returns
+    -------
+    bool
+        True if `validate_NetCDF_file` accepts the file, False if it raises a
+        NetCDFValidationError
+    
+    Examples
+    --------
+    >>> if not is_valid_NetCDF_file('data.nc'):
+    ...     print('re-download needed')
+    """
+    try:
+        validate_NetCDF_file(filename, **kwargs)
+    except NetCDFValidationError:
+        return False
+
+    return True
+
+
+@lru_cache(maxsize=256)
+def _validate_NetCDF_structure(
+        filename: Union[str, Path],
+        filename_absolute: str,
+        file_type: str,
+        check_integrity: bool,
+        file_size: int,
+        mtime_ns: int,
+        is_hdf5: bool = True) -> None:
+    """
+    Open a NetCDF file and check its structure.
+    
+    Results are cached by path, size and modification time. Only successful
+    validations are cached, since raised exceptions are not memoized.
+    """
+    # Prefetch the header region so HDF5's scattered metadata reads hit the page cache
+    advise_file_access(filename_absolute, 0, NETCDF_HEADER_PREFETCH_SIZE)
+    
+    # NetCDF-4 files are HDF5 underneath - h5py opens them lazily, without building
+    # netCDF4's dimension/variable/attribute wrappers. Classic files need netCDF4.
+    use_h5py = h5py is not None and is_hdf5
+    
+    # Attempt to open and validate NetCDF structure. netCDF-C isn't thread-safe, so a
+    # netCDF4 open holds the lock until the file is closed; h5py serializes its own calls.
+    try:
+        with nullcontext() if use_h5py else NETCDF_LOCK:
+            if use_h5py:
+                dataset = h5py.File(filename_absolute, "r")
+            else:
+                dataset = netCDF4.Dataset(filename_absolute, "r")
             
-            # Verify that the file contains data structures
-            if len(dimensions) == 0 and len(variables) == 0:
-                raise NetCDFCorruptedError(
-                    f"{file_type} file is corrupted: contains no dimensions or variables. "
-                    f"File: {filename}, Size: {file_size} bytes"
-                )
+            with dataset as ds:
+                # Try to access basic attributes to ensure file is readable
+                if use_h5py:
+                    # root members cover netCDF dimensions, variables and groups
+                    variables = ds
+                    empty = len(ds) == 0
+                else:
+                    variables = ds.variables
+                    empty = len(ds.dimensions) == 0 and len(variables) == 0
             
-            # Optionally verify file integrity
-            if check_integrity:
-                # Read a small portion of data to verify the file can be accessed
-                for var_name in list(variables.keys())[:3]:  # Check up to 3 variables
-                    try:
-                        _ = variables[var_name].shape
-                    except Exception as e:
-                        raise NetCDFCorruptedError(
-                            f"{file_type} file data cannot be accessed. "
-                            f"Variable '{var_name}' failed: {e}. "
-                            f"File: {filename}, Size: {file_size} bytes"
-                        )
+                # Verify that the file contains data structures
+                if empty:
+                    raise NetCDFCorruptedError(
+                        f"{file_type} file is corrupted: contains no dimensions or variables. "
+                        f"File: {filename}, Size: {file_size} bytes"
+                    )
+            
+                # Optionally verify file integrity
+                if check_integrity:
+                    # Probe one variable's metadata - a corrupt object header index fails on the first access
+                    if variables:
+                        var_name = next(iter(variables))
+
+                        try:
+                            _ = getattr(variables[var_name], "shape", None)
+                        except Exception as e:
+                            raise NetCDFCorruptedError(
+                                f"{file_type} file data cannot be accessed. "
+                                f"Variable '{var_name}' failed: {e}. "
+                                f"File: {filename}, Size: {file_size} bytes"
+                            )
     
     except (OSError, IOError) as e:
-        # I/O errors suggest file read problems or corruption
-        error_msg = str(e).lower()
-        error_str = str(e)
-        
-        # Check for specific HDF/NetCDF error codes
-        if "errno -101" in error_str or "hdf error" in error_msg:
-            raise NetCDFReadError(
+        # I/O errors suggest file read problems or corruption.
+        # h5py reports HDF5 format errors as OSError without an errno.
+        if e.errno == NC_EHDFERR or (use_h5py and e.errno is None):
+            raise NetCDFHDFCorruptionError(
                 f"{file_type} file has HDF/NetCDF format errors (possibly corrupted during download): {filename}. "
                 f"File size: {file_size} bytes. Error: {e}. "
                 f"Recommendation: Delete and re-download this file."
             )
-        elif "permission" in error_msg or "access" in error_msg:
+        elif isinstance(e, PermissionError) or e.errno in (errno.EACCES, errno.EPERM):
             raise NetCDFReadError(
                 f"{file_type} file cannot be read due to permission error: {filename}. "
                 f"Error: {e}"
@@ -135,3 +330,14 @@ def validate_NetCDF_file(filename: Union[str, Path], file_type: str = "NetCDF",
             f"{file_type} file validation failed with unexpected error: {filename}. "
             f"File size: {file_size} bytes. Error type: {type(e).__name__}, Message: {e}"
         )
+    
+    if check_integrity:
+        # Stream the whole file through a hash so that every block must be readable. The
+        # caller asked for the full read, so fall back to SHA-256 without blake3/xxhash
+        try:
+            compute_file_checksum(filename_absolute, algorithm=fast_checksum_algorithm() or 'sha256', chunk_size=4 << 20)
+        except OSError as e:
+            raise NetCDFReadError(
+                f"{file_type} file cannot be read in full: {filename}. "
+                f"File size: {file_size} bytes. Error: {e}"
+            )
@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from .exceptions import NetCDFValidationError
+from .validate_NetCDF_file import validate_NetCDF_file
+
+
+def validate_NetCDF_files(
+        files: Dict[Union[str, Path], str],
+        check_integrity: bool = False,
+        deep: bool = True,
+        stats: Optional[Dict[Union[str, Path], os.stat_result]] = None) -> Dict[Union[str, Path], Optional[NetCDFValidationError]]:
+    """
+    Validate several NetCDF files at once.
+    
+    Each file is validated with `validate_NetCDF_file` on its own thread so that
+    the filesystem metadata round-trips for the files overlap, which matters on
+    network filesystems where each open costs several RPCs.
+    
+    Parameters
+    ----------
+    files : dict
+        Mapping of file path to descriptive file type (e.g., "Reflectance", "Mask")
+    check_integrity : bool, optional
+        Passed through to `validate_NetCDF_file`. Defaults to False.
+    deep : bool, optional
+        Passed through to `validate_NetCDF_file`. Defaults to True.
+    stats : dict, optional
+        Mapping of file path to a stat result the caller already has, so those
+        files are not stat'ed again. Defaults to None.
+    
+    Returns
+    -------
+    dict
+        Mapping of each file path to None if it passed validation, or to the
+        NetCDFValidationError it raised
+    
+    Examples
+    --------
+    >>> errors = validate_NetCDF_files({'rfl.nc': 'Reflectance', 'mask.nc': 'Mask'})
+    >>> invalid = [filename for filename, error in errors.items() if error is not None]
+    """
+    def _validate(filename: Union[str, Path]) -> Optional[NetCDFValidationError]:
+        try:
+            validate_NetCDF_file(
+                filename,
+                file_type=files[filename],
+                check_integrity=check_integrity,
+                deep=deep,
+                _stat=stats.get(filename) if stats else None
+            )
+        except NetCDFValidationError as e:
+            return e
+
+        return None
+
+    if not files:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(files)) as executor:
+        return dict(zip(files, executor.map(_validate, files)))
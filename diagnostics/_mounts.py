@@ -0,0 +1,44 @@
+"""
+Mount table lookups shared by the diagnostic scripts.
+
+Standard library only, so the filesystem checks still run when EMITL2ARFL or its
+HDF5 stack fails to import - often the very problem being diagnosed.
+"""
+
+import re
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
+def mount_table():
+    """Read (mount point, filesystem type, device) for every mount, longest mount point first."""
+    try:
+        with open('/proc/self/mounts') as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    
+    def unescape(field):
+        # mount points escape spaces and other special characters as octal, e.g. \040
+        return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), field)
+    
+    mounts = []
+    
+    for line in lines:
+        fields = line.split()
+        
+        if len(fields) >= 3:
+            mounts.append((unescape(fields[1]), fields[2], unescape(fields[0])))
+    
+    return sorted(mounts, key=lambda mount: -len(mount[0]))
+
+def find_mount(path):
+    """Find the (mount point, filesystem type, device) that holds path, or None if unknown."""
+    path = str(path)
+    
+    return next(
+        (
+            mount for mount in mount_table()
+            if path == mount[0] or path.startswith(mount[0].rstrip('/') + '/')
+        ),
+        None
+    )
@@ -64,9 +64,13 @@ if len(sys.argv) > 1:
     print("=" * 60)
     print()
     
-    # Check file exists and size
-    if os.path.exists(test_file):
-        size = os.path.getsize(test_file)
+    # Check file exists and size - one stat answers both
+    try:
+        size = os.stat(test_file).st_size
+    except FileNotFoundError:
+        size = None
+    
+    if size is not None:
         print(f"File exists: {test_file}")
         print(f"File size: {size:,} bytes ({size/1024/1024:.1f} MB)")
         print()
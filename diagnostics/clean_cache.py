@@ -3,22 +3,252 @@
 Clean up corrupted EMIT cache files and validate remaining ones.
 """
 
+import atexit
+import heapq
 import os
 import logging
+import queue
+import sqlite3
+import threading
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from EMITL2ARFL.constants import NETCDF_HEADER_PREFETCH_SIZE
+from EMITL2ARFL.exceptions import NetCDFCorruptedError
+from EMITL2ARFL.file_utils import advise_file_access, compute_file_checksum, validation_marker_checksum
 from EMITL2ARFL.validate_NetCDF_file import validate_NetCDF_file
 
+# after EMITL2ARFL, which sets HDF5_USE_FILE_LOCKING=FALSE (unless already set) before HDF5 loads
+import netCDF4
+
+# Log records go onto a queue and a single listener thread writes them, so logging
+# callers never block on the stream write (one line per file adds up on large caches)
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(
+    '[%(asctime)s %(levelname)s] %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+))
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+
+# the queued record's message is formatted on the listener side
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
 logging.basicConfig(
     level=logging.INFO,
-    format='[%(asctime)s %(levelname)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
+    handlers=[_log_queue_handler]
 )
 
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+def _flush_log():
+    """Write out every queued log record, e.g. before prompting the user."""
+    _log_listener.stop()
+    _log_listener.start()
+
 logger = logging.getLogger(__name__)
 
-def clean_cache_directory(cache_dir):
-    """Clean up corrupted NetCDF files in the cache directory."""
-    cache_path = Path(cache_dir).expanduser()
+# Validation is I/O-bound (HDF5 releases the GIL), so threads overlap the network round-trips
+MAX_VALIDATION_WORKERS = 32
+
+# How many files beyond those being validated have their headers prefetched
+PREFETCH_DEPTH = 8
+
+# Validation outcomes, keyed by (path, mtime, size), persist across runs here - both files
+# that passed and files found corrupted, so neither is re-opened until it changes. Other
+# failures (I/O errors, stale handles, lock contention) may be transient and are retried.
+# Set EMIT_SKIP_VALIDATION_CACHE=1 to ignore it and validate every file
+VALIDATION_CACHE_PATH = Path("~/.cache/emit_l2a_rfl/validation.db").expanduser()
+VALIDATION_CACHE_BATCH_SIZE = 500
+
+ValidationResult = namedtuple("ValidationResult", ["path", "size", "mtime_ns", "error", "cached"])
+
+class CachedValidationFailure(Exception):
+    """A file that failed validation in an earlier run and has not changed since."""
+    def __init__(self, error_name):
+        super().__init__(f"failed validation in an earlier run with {error_name}")
+        self.error_name = error_name
+
+def _open_validation_cache(cache_db=VALIDATION_CACHE_PATH):
+    """Open the validation cache database, or return None if it is disabled or unavailable."""
+    if os.environ.get("EMIT_SKIP_VALIDATION_CACHE") == "1":
+        return None
+    
+    try:
+        cache_db.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(cache_db)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS v(path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, status TEXT, err TEXT)"
+        )
+        
+        # caches written before failures were recorded only hold valid files
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(v)")}
+        
+        if "status" not in columns:
+            with connection:
+                connection.execute("ALTER TABLE v ADD COLUMN status TEXT DEFAULT 'ok'")
+                connection.execute("ALTER TABLE v ADD COLUMN err TEXT")
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Validation cache unavailable, validating every file: {e}")
+        return None
+    
+    return connection
+
+def _load_validation_cache(connection, cache_path):
+    """Load the cached (mtime, size, status, err) of every previously validated file under cache_path."""
+    if connection is None:
+        return {}
+    
+    prefix = os.path.join(str(cache_path), "")
+    rows = connection.execute(
+        "SELECT path, mtime, size, status, err FROM v WHERE substr(path, 1, ?) = ?",
+        (len(prefix), prefix)
+    )
+    
+    return {path: (mtime, size, status, err) for path, mtime, size, status, err in rows}
+
+def _save_validation_cache(connection, results):
+    """
+    Record the outcome for every file validated in this run, committing in batches.
+    
+    Only corruption is cached as a failure - a file that could not be read this time
+    is validated again on the next run.
+    """
+    if connection is None:
+        return
+    
+    rows = [
+        (
+            str(result.path),
+            result.mtime_ns,
+            result.size,
+            "ok" if result.error is None else "bad",
+            None if result.error is None else type(result.error).__name__
+        )
+        for result in results
+        if result.mtime_ns is not None and not result.cached
+        and (result.error is None or isinstance(result.error, NetCDFCorruptedError))
+    ]
+    
+    try:
+        for i in range(0, len(rows), VALIDATION_CACHE_BATCH_SIZE):
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO v VALUES (?, ?, ?, ?, ?)",
+                    rows[i:i + VALIDATION_CACHE_BATCH_SIZE]
+                )
+    except sqlite3.Error as e:
+        logger.warning(f"Could not update validation cache: {e}")
+
+def _iter_nc(root, child_counts):
+    """
+    Yield directory entries for the .nc files below root, recursively.
+    
+    The number of entries in every directory visited is recorded in child_counts,
+    so emptied directories can be found later without listing them again.
+    """
+    root_path = Path(root)  # one Path per directory, not per entry
+    
+    with os.scandir(root) as entries:
+        for entry in entries:
+            child_counts[root_path] += 1
+            
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_nc(entry.path, child_counts)
+            elif entry.name.endswith('.nc'):
+                yield entry
+
+def _is_cached(entry, known):
+    """Check whether a file is unchanged since its validation outcome was cached."""
+    st = entry.stat()
+    return known.get(entry.path, (None, None))[:2] == (st.st_mtime_ns, st.st_size)
+
+def _prefetch_headers(nc_files, known, slots, stop):
+    """
+    Ask the kernel to start reading the headers of upcoming files, staying a bounded
+    distance ahead of the validation results so the page cache isn't flooded.
+    """
+    for entry in nc_files:
+        slots.acquire()
+        
+        if stop.is_set():
+            return
+        
+        try:
+            if not _is_cached(entry, known):
+                advise_file_access(entry.path, 0, NETCDF_HEADER_PREFETCH_SIZE)
+        except OSError:
+            pass  # the validation worker reports unreadable files
+
+def _validate_one(entry, known, verify_checksums=False):
+    """
+    Validate a single file, returning its size and the exception it raised, if any.
+    
+    With verify_checksums, a file that passes validation is also hashed against the
+    checksum recorded when it was downloaded. That reads the whole file, so it is off
+    by default - the structural validation only touches the header and metadata.
+    """
+    nc_file = Path(entry.path)
+    
+    try:
+        # one stat per file, shared with the cache lookup, the validator and the size report
+        st = entry.stat()
+    except OSError as e:
+        return ValidationResult(nc_file, 0, None, e, False)
+    
+    # unchanged since it was last validated - reuse the outcome without opening it again
+    mtime_ns, size, status, err = known.get(entry.path, (None, None, None, None))
+    
+    if (mtime_ns, size) == (st.st_mtime_ns, st.st_size):
+        error = None if status == "ok" else CachedValidationFailure(err)
+        return ValidationResult(nc_file, st.st_size, st.st_mtime_ns, error, True)
+    
+    try:
+        validate_NetCDF_file(nc_file, file_type="NetCDF", _stat=st)
+    except Exception as e:
+        return ValidationResult(nc_file, st.st_size, st.st_mtime_ns, e, False)
+    
+    # checksummed when it was downloaded and unchanged since - catches damage to data blocks
+    checksum = validation_marker_checksum(entry.path, st) if verify_checksums else None
+    
+    if checksum is not None:
+        algorithm, _, digest = checksum.partition(":")
+        
+        try:
+            matches = compute_file_checksum(entry.path, algorithm) == digest
+        except ValueError:
+            matches = True  # algorithm not installed here - the validation above stands
+        except OSError as e:
+            return ValidationResult(nc_file, st.st_size, st.st_mtime_ns, e, False)
+        
+        if not matches:
+            error = NetCDFCorruptedError(f"NetCDF file does not match its recorded {algorithm} checksum: {nc_file}")
+            return ValidationResult(nc_file, st.st_size, st.st_mtime_ns, error, False)
+    
+    return ValidationResult(nc_file, st.st_size, st.st_mtime_ns, None, False)
+
+def _warm_up_netcdf():
+    """
+    Make one throwaway open so netCDF-C/HDF5 one-time initialization happens here,
+    once, rather than in whichever validation workers happen to open a file first.
+    """
+    try:
+        netCDF4.Dataset(os.devnull, 'r').close()
+    except Exception:
+        pass  # expected - os.devnull is not a NetCDF file
+
+def clean_cache_directory(cache_dir, verify_checksums=False):
+    """
+    Clean up corrupted NetCDF files in the cache directory.
+    
+    With verify_checksums, files are also hashed against the checksums recorded
+    when they were downloaded, which reads every file in full.
+    """
+    cache_path = Path(cache_dir).expanduser().absolute()
     
     if not cache_path.exists():
         logger.info(f"Cache directory does not exist: {cache_dir}")
@@ -31,19 +261,50 @@ def clean_cache_directory(cache_dir):
     total_size_corrupted = 0
     
     # Find all .nc files
-    nc_files = list(cache_path.rglob('*.nc'))
+    child_counts = Counter()
+    nc_files = list(_iter_nc(cache_path, child_counts))
     logger.info(f"Found {len(nc_files)} NetCDF files")
     
-    for nc_file in nc_files:
-        try:
-            validate_NetCDF_file(nc_file, file_type="NetCDF")
-            valid_files.append(nc_file)
-            logger.info(f"✓ Valid: {nc_file.name}")
-        except Exception as e:
-            corrupted_files.append(nc_file)
-            file_size = nc_file.stat().st_size
-            total_size_corrupted += file_size
-            logger.warning(f"✗ Corrupted: {nc_file.name} ({file_size / (1024**2):.2f} MB) - {type(e).__name__}")
+    validation_cache = _open_validation_cache()
+    known = _load_validation_cache(validation_cache, cache_path)
+    results = []
+    
+    if nc_files:
+        _warm_up_netcdf()
+        max_workers = min(MAX_VALIDATION_WORKERS, len(nc_files))
+        
+        # a background thread pipelines header read-ahead in front of the workers (network filesystems)
+        prefetch_slots = threading.Semaphore(max_workers + PREFETCH_DEPTH)
+        stop_prefetch = threading.Event()
+        threading.Thread(
+            target=_prefetch_headers,
+            args=(nc_files, known, prefetch_slots, stop_prefetch),
+            daemon=True
+        ).start()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # results arrive in scan order, so the log reads the same as a sequential run
+            for result in executor.map(partial(_validate_one, known=known, verify_checksums=verify_checksums), nc_files):
+                prefetch_slots.release()
+                results.append(result)
+                nc_file, file_size, _, e, cached = result
+                
+                if e is None:
+                    valid_files.append(nc_file)
+                    logger.info(f"✓ Valid{' (cached)' if cached else ''}: {nc_file.name}")
+                else:
+                    corrupted_files.append(nc_file)
+                    total_size_corrupted += file_size
+                    error_name = getattr(e, "error_name", type(e).__name__)
+                    logger.warning(f"✗ Corrupted{' (cached)' if cached else ''}: {nc_file.name} ({file_size / (1024**2):.2f} MB) - {error_name}")
+    
+        stop_prefetch.set()
+        prefetch_slots.release()
+    
+    _save_validation_cache(validation_cache, results)
+    
+    if validation_cache is not None:
+        validation_cache.close()
     
     # Summary
     logger.info(f"\n{'='*80}")
@@ -54,20 +315,44 @@ def clean_cache_directory(cache_dir):
     logger.info(f"{'='*80}\n")
     
     if corrupted_files:
+        _flush_log()
         response = input("Delete corrupted files? (yes/no): ")
         if response.lower() in ['yes', 'y']:
+            emptied = []
+            
             for nc_file in corrupted_files:
                 try:
                     logger.info(f"Deleting: {nc_file}")
-                    nc_file.unlink()
-                    
-                    # Also delete parent directory if empty
-                    parent = nc_file.parent
-                    if parent != cache_path and not list(parent.iterdir()):
-                        logger.info(f"Deleting empty directory: {parent}")
-                        parent.rmdir()
-                except Exception as e:
+                    os.unlink(nc_file)
+                except OSError as e:
                     logger.error(f"Could not delete {nc_file}: {e}")
+                    continue
+                
+                parent = nc_file.parent
+                child_counts[parent] -= 1
+                
+                if child_counts[parent] == 0:
+                    heapq.heappush(emptied, (-len(parent.parts), parent))
+            
+            # Also delete directories left empty, deepest first, so that a chain of
+            # directories emptied by the deletions collapses in a single pass
+            while emptied:
+                _, directory = heapq.heappop(emptied)
+                
+                if cache_path not in directory.parents:
+                    continue
+                
+                try:
+                    os.rmdir(directory)
+                except OSError as e:
+                    logger.error(f"Could not delete directory {directory}: {e}")
+                    continue
+                
+                logger.info(f"Deleting empty directory: {directory}")
+                child_counts[directory.parent] -= 1
+                
+                if child_counts[directory.parent] == 0:
+                    heapq.heappush(emptied, (-len(directory.parent.parts), directory.parent))
             
             logger.info(f"✓ Cleaned up {len(corrupted_files)} corrupted files")
         else:
@@ -76,11 +361,15 @@ def clean_cache_directory(cache_dir):
         logger.info("✓ No corrupted files found!")
 
 if __name__ == '__main__':
-    import sys
+    import argparse
     
-    if len(sys.argv) > 1:
-        cache_dir = sys.argv[1]
-    else:
-        cache_dir = '~/data/EMIT_L2A_RFL'
+    parser = argparse.ArgumentParser(description="Clean up corrupted EMIT cache files")
+    parser.add_argument("cache_dir", nargs="?", default="~/data/EMIT_L2A_RFL", help="Cache directory to clean")
+    parser.add_argument(
+        "--verify-checksums",
+        action="store_true",
+        help="Also hash files against the checksums recorded at download (reads every file in full)"
+    )
+    args = parser.parse_args()
     
-    clean_cache_directory(cache_dir)
+    clean_cache_directory(args.cache_dir, verify_checksums=args.verify_checksums)
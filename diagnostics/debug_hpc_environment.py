@@ -26,69 +26,105 @@ The script will:
     4. Provide specific recommendations for any issues found
 """
 
+import importlib
+import importlib.util
+import io
+import multiprocessing as mp
 import os
+import subprocess
 import sys
+from contextlib import redirect_stderr, redirect_stdout
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+from _mounts import find_mount
+
 def print_section(title):
-    """Print a formatted section header."""
+    """Print a formatted section header, writing out the previous section first."""
+    # stdout is block-buffered (see main), so each section reaches the terminal/log in one write
+    sys.stdout.flush()
     print(f"\n{'='*60}")
     print(f" {title}")
     print('='*60)
 
-def check_file_details(filename):
-    """Check basic file system details."""
+def check_file_details(filepath, filename):
+    """Check basic file system details of an already resolved path."""
     print_section("FILE SYSTEM DETAILS")
     
-    filepath = Path(os.path.expanduser(filename))
     print(f"Original path: {filename}")
-    print(f"Expanded path: {filepath}")
-    print(f"Absolute path: {filepath.resolve()}")
-    print(f"File exists: {filepath.exists()}")
+    print(f"Expanded path: {os.path.expanduser(filename)}")
+    print(f"Absolute path: {filepath}")
     
-    if filepath.exists():
+    # a single stat answers both whether the file exists and its details
+    try:
         stat = filepath.stat()
+    except FileNotFoundError:
+        stat = None
+    
+    print(f"File exists: {stat is not None}")
+    
+    if stat is not None:
         print(f"File size: {stat.st_size:,} bytes")
         print(f"File mode: {oct(stat.st_mode)}")
         print(f"Is readable: {os.access(filepath, os.R_OK)}")
         print(f"Is writable: {os.access(filepath, os.W_OK)}")
         
-        # Check if it's on a network filesystem
-        try:
-            import subprocess
-            result = subprocess.run(['df', '-T', str(filepath)], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                print(f"\nFilesystem info:")
-                print(result.stdout)
-        except Exception as e:
-            print(f"Could not check filesystem type: {e}")
+        # Check if it's on a network filesystem - from the mount table where there is one
+        mount = find_mount(filepath)
+        
+        if mount is not None:
+            mount_point, fstype, device = mount
+            print(f"\nFilesystem info:")
+            print(f"  Type: {fstype}")
+            print(f"  Mounted on: {mount_point}")
+            print(f"  Device: {device}")
+        else:
+            try:
+                result = subprocess.run(['df', '-T', str(filepath)], 
+                                      capture_output=True, text=True, timeout=5)
+                if result.returncode == 0:
+                    print(f"\nFilesystem info:")
+                    print(result.stdout)
+            except Exception as e:
+                print(f"Could not check filesystem type: {e}")
+
+@lru_cache(maxsize=None)
+def _optional_module(name):
+    """Import a module if it is installed, or return None - probed once per name."""
+    # find_spec answers "not installed" without raising and unwinding a failed import
+    if importlib.util.find_spec(name) is None:
+        return None
+    
+    return importlib.import_module(name)
 
 def check_library_versions():
     """Check versions of critical libraries."""
     print_section("LIBRARY VERSIONS")
     
-    try:
-        import netCDF4
-        print(f"netCDF4 version: {netCDF4.__version__}")
-        print(f"netCDF4 file: {netCDF4.__file__}")
-    except ImportError as e:
-        print(f"ERROR: Cannot import netCDF4: {e}")
+    netCDF4 = _optional_module('netCDF4')
+    
+    if netCDF4 is None:
+        print("ERROR: Cannot import netCDF4: not installed")
         return False
     
-    try:
-        import h5py
+    print(f"netCDF4 version: {netCDF4.__version__}")
+    print(f"netCDF4 file: {netCDF4.__file__}")
+    
+    h5py = _optional_module('h5py')
+    
+    if h5py is not None:
         print(f"h5py version: {h5py.__version__}")
         print(f"h5py file: {h5py.__file__}")
         print(f"HDF5 version: {h5py.version.hdf5_version}")
-    except ImportError:
+    else:
         print("h5py not available (optional)")
     
-    try:
-        import numpy
+    numpy = _optional_module('numpy')
+    
+    if numpy is not None:
         print(f"numpy version: {numpy.__version__}")
-    except ImportError:
+    else:
         print("numpy not available")
     
     return True
@@ -110,12 +146,11 @@ def check_environment_variables():
         value = os.environ.get(var, '<not set>')
         print(f"{var}: {value}")
 
-def test_direct_netcdf4_access(filename):
+def test_direct_netcdf4_access(filepath):
     """Test direct netCDF4.Dataset access."""
     print_section("DIRECT NETCDF4 ACCESS TEST")
     
     import netCDF4
-    filepath = Path(os.path.expanduser(filename)).resolve()
     
     print(f"Attempting to open: {filepath}")
     
@@ -149,44 +184,29 @@ def test_direct_netcdf4_access(filename):
         
         return False
 
-def test_with_file_locking_disabled(filename):
+def test_with_file_locking_disabled(filepath):
     """Test with HDF5 file locking disabled."""
     print_section("TEST WITH FILE LOCKING DISABLED")
     
-    # Save original value
-    original_value = os.environ.get('HDF5_USE_FILE_LOCKING')
+    # HDF5 reads HDF5_USE_FILE_LOCKING once when the library initializes, and
+    # reloading the netCDF4 module doesn't re-initialize it - so main runs this
+    # test in a fresh worker process that sets it before importing netCDF4.
+    print(f"Running with HDF5_USE_FILE_LOCKING={os.environ.get('HDF5_USE_FILE_LOCKING', '<not set>')}")
+    print(f"Attempting to open: {filepath}")
+    
+    import netCDF4
     
     try:
-        # Disable file locking
-        os.environ['HDF5_USE_FILE_LOCKING'] = 'FALSE'
-        print("Set HDF5_USE_FILE_LOCKING=FALSE")
-        
-        # Force reload of netCDF4 to pick up new environment
-        import netCDF4
-        if 'netCDF4' in sys.modules:
-            print("Reloading netCDF4 module...")
-            import importlib
-            importlib.reload(netCDF4)
-        
-        filepath = Path(os.path.expanduser(filename)).resolve()
-        print(f"Attempting to open: {filepath}")
-        
-        with netCDF4.Dataset(str(filepath), 'r') as ds:
-            print(f"✓ SUCCESS with HDF5_USE_FILE_LOCKING=FALSE")
-            return True
-            
+        with netCDF4.Dataset(str(filepath), 'r'):
+            pass
     except Exception as e:
-        print(f"✗ FAILED even with file locking disabled: {e}")
+        print(f"✗ FAILED even with file locking disabled: {type(e).__name__}: {e}")
         return False
-        
-    finally:
-        # Restore original value
-        if original_value is None:
-            os.environ.pop('HDF5_USE_FILE_LOCKING', None)
-        else:
-            os.environ['HDF5_USE_FILE_LOCKING'] = original_value
+    
+    print(f"✓ SUCCESS with HDF5_USE_FILE_LOCKING=FALSE")
+    return True
 
-def test_validate_function(filename):
+def test_validate_function(filepath):
     """Test the actual validate_NetCDF_file function."""
     print_section("VALIDATE_NETCDF_FILE FUNCTION TEST")
     
@@ -194,7 +214,7 @@ def test_validate_function(filename):
         from EMITL2ARFL import validate_NetCDF_file
         print(f"Attempting validation with validate_NetCDF_file()...")
         
-        validate_NetCDF_file(filename)
+        validate_NetCDF_file(filepath)
         print(f"✓ SUCCESS: File passed validation")
         return True
         
@@ -204,9 +224,30 @@ def test_validate_function(filename):
         # Show the full traceback
         import traceback
         print(f"\nFull traceback:")
+        sys.stdout.flush()
         traceback.print_exc()
         return False
 
+# Access tests run side by side, each in its own spawned interpreter with its own environment
+ACCESS_TESTS = {
+    'direct': (test_direct_netcdf4_access, {}),
+    'nolock': (test_with_file_locking_disabled, {'HDF5_USE_FILE_LOCKING': 'FALSE'}),
+    'validate': (test_validate_function, {}),
+}
+
+def _run_access_test(name, filepath, env):
+    """Run one access test in a pool worker, returning whether it passed and what it printed."""
+    # set before anything imports netCDF4, so HDF5 picks it up when it initializes in this process
+    os.environ.update(env)
+    test, _ = ACCESS_TESTS[name]
+    
+    output = io.StringIO()
+    
+    with redirect_stdout(output), redirect_stderr(output):
+        passed = test(filepath)
+    
+    return passed, output.getvalue()
+
 def download_sample_granule():
     """Download a sample EMIT L2A RFL granule for testing."""
     print_section("DOWNLOADING SAMPLE GRANULE")
@@ -286,11 +327,16 @@ def download_sample_granule():
     except Exception as e:
         print(f"✗ Download failed: {e}")
         import traceback
+        sys.stdout.flush()
         traceback.print_exc()
         return None
 
 def main():
     """Main diagnostic routine."""
+    # Buffer whole sections instead of flushing every line - slow when redirected to a network filesystem
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+    
     print("="*60)
     print(" HPC NetCDF Environment Diagnostic Tool")
     print("="*60)
@@ -321,8 +367,11 @@ def main():
             print("="*60)
             sys.exit(1)
     
+    # Expand and resolve the path once - resolving walks every path component
+    filepath = Path(os.path.expanduser(filename)).resolve()
+    
     # Run all diagnostic checks
-    check_file_details(filename)
+    check_file_details(filepath, filename)
     
     if not check_library_versions():
         print("\nERROR: Required libraries not available. Exiting.")
@@ -330,10 +379,19 @@ def main():
     
     check_environment_variables()
     
-    # Try different access methods
-    test1 = test_direct_netcdf4_access(filename)
-    test2 = test_with_file_locking_disabled(filename)
-    test3 = test_validate_function(filename)
+    # Try different access methods in parallel, then print their reports in order
+    sys.stdout.flush()
+    
+    with mp.get_context('spawn').Pool(len(ACCESS_TESTS)) as pool:
+        results = pool.starmap(
+            _run_access_test,
+            [(name, filepath, env) for name, (_, env) in ACCESS_TESTS.items()]
+        )
+    
+    for _, output in results:
+        sys.stdout.write(output)
+    
+    test1, test2, test3 = (passed for passed, _ in results)
     
     # Summary
     print_section("SUMMARY")
@@ -383,6 +441,8 @@ def main():
         print("    - Re-downloading the file")
         print("    - Checking md5/checksum integrity")
         print("    - Verifying HDF5 library versions match")
+    
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
@@ -25,10 +25,28 @@ logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
 def print_section(title):
-    """Print a formatted section header."""
+    """Print a formatted section header, writing it out along with the previous section."""
     print("\n" + "=" * 80)
     print(f"  {title}")
     print("=" * 80)
+    # stdout is block-buffered (see main), so this is one write per section rather
+    # than one per line - flushed here so the header precedes the section's log lines
+    sys.stdout.flush()
+
+def _drop_cache(path):
+    """Flush a file and ask the kernel to drop it from the page cache, so the next read comes from disk."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fdatasync(fd)  # dirty pages can't be dropped
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
 
 def test_library_versions():
     """Test library versions and build information."""
@@ -96,12 +114,13 @@ def test_basic_netcdf_operations():
             print(f"✓ Successfully created NetCDF4 file")
             
             # Read file
+            _drop_cache(test_file)
             logger.info("Reading test file")
             with netCDF4.Dataset(test_file, 'r') as ds:
                 assert ds.title == "Test NetCDF file"
-                assert 'data' in ds.variables
-                assert ds.variables['data'].shape == (10, 20)
-                assert ds.variables['data'].units == "test_units"
+                var = ds.variables['data']  # a KeyError fails the test as well as an assert would
+                assert var.shape == (10, 20)
+                assert var.units == "test_units"
             
             print(f"✓ Successfully read NetCDF4 file")
             
@@ -114,6 +133,7 @@ def test_basic_netcdf_operations():
         except Exception as e:
             print(f"✗ Basic NetCDF operations failed: {e}")
             import traceback
+            sys.stdout.flush()
             traceback.print_exc()
             return False
 
@@ -125,6 +145,7 @@ def test_netcdf_formats():
     import numpy as np
     
     formats = ['NETCDF4', 'NETCDF4_CLASSIC', 'NETCDF3_CLASSIC', 'NETCDF3_64BIT']
+    data = np.arange(5, dtype=np.float32)
     
     with tempfile.TemporaryDirectory() as tmpdir:
         for fmt in formats:
@@ -134,12 +155,13 @@ def test_netcdf_formats():
                 with netCDF4.Dataset(test_file, 'w', format=fmt) as ds:
                     ds.createDimension('x', 5)
                     var = ds.createVariable('data', 'f4', ('x',))
-                    var[:] = np.arange(5)
+                    var[:] = data
                 
                 # Read back
+                _drop_cache(test_file)
                 with netCDF4.Dataset(test_file, 'r') as ds:
                     assert len(ds.dimensions['x']) == 5
-                    assert list(ds.variables['data'][:]) == list(range(5))
+                    assert np.array_equal(ds.variables['data'][:], data)
                 
                 print(f"✓ Format {fmt}: OK")
                 
@@ -160,7 +182,8 @@ def test_compression():
         compressed_file = os.path.join(tmpdir, "test_compressed.nc")
         uncompressed_file = os.path.join(tmpdir, "test_uncompressed.nc")
         
-        data = np.random.rand(100, 100)
+        # float32 to match the 'f4' variables, so the data isn't converted on every write
+        data = np.random.default_rng().random((100, 100), dtype=np.float32)
         
         try:
             # Compressed
@@ -168,7 +191,7 @@ def test_compression():
                 ds.createDimension('x', 100)
                 ds.createDimension('y', 100)
                 var = ds.createVariable('data', 'f4', ('x', 'y'), 
-                                       zlib=True, complevel=4)
+                                       zlib=True, complevel=1, shuffle=True)
                 var[:] = data
             
             # Uncompressed
@@ -211,6 +234,7 @@ def test_hdf5_file_locking():
                 var[:] = np.arange(5)
             
             # Try to open file multiple times for reading
+            _drop_cache(test_file)
             ds1 = netCDF4.Dataset(test_file, 'r')
             ds2 = netCDF4.Dataset(test_file, 'r')
             
@@ -233,6 +257,7 @@ def test_hdf5_file_locking():
         except Exception as e:
             print(f"✗ File locking test failed: {e}")
             import traceback
+            sys.stdout.flush()
             traceback.print_exc()
             return False
 
@@ -243,35 +268,41 @@ def test_large_file_support():
     import netCDF4
     import numpy as np
     
-    print("  Note: This test creates a ~100MB file, not a full 2GB+ file")
+    print("  Note: This test declares a ~4GB variable but only writes two of its chunks")
     
     with tempfile.TemporaryDirectory() as tmpdir:
         test_file = os.path.join(tmpdir, "test_large.nc")
         
         try:
-            # Create a moderately large file
+            # Declare a variable larger than 2^32 bytes - HDF5 allocates chunked
+            # storage lazily, so chunks that are never written take no disk space
+            chunk_size = 100
             with netCDF4.Dataset(test_file, 'w', format='NETCDF4') as ds:
-                ds.createDimension('x', 1000)
+                ds.createDimension('x', 100000)
                 ds.createDimension('y', 1000)
                 ds.createDimension('z', 10)
                 
-                var = ds.createVariable('data', 'f4', ('x', 'y', 'z'))
+                var = ds.createVariable('data', 'f4', ('x', 'y', 'z'), chunksizes=(chunk_size, 1000, 10))
                 
-                # Write in chunks to avoid memory issues
-                chunk_size = 100
-                for i in range(0, 1000, chunk_size):
-                    var[i:i+chunk_size, :, :] = np.random.rand(chunk_size, 1000, 10)
+                # Write the first and last chunks, reusing one float32 buffer
+                chunk = np.random.default_rng().random((chunk_size, 1000, 10), dtype=np.float32)
+                var[:chunk_size, :, :] = chunk
+                var[-chunk_size:, :, :] = chunk
+                
+                variable_size_gb = var.size * var.dtype.itemsize / (1024 ** 3)
             
             file_size = os.path.getsize(test_file)
             file_size_mb = file_size / (1024 * 1024)
             
-            # Read back a sample
+            # Read back a sample from the far end of the variable
+            _drop_cache(test_file)
             with netCDF4.Dataset(test_file, 'r') as ds:
-                sample = ds.variables['data'][0:10, 0:10, 0]
+                sample = ds.variables['data'][-10:, 0:10, 0]
             
             print(f"✓ Large file support OK")
+            print(f"  Declared variable size: {variable_size_gb:.2f} GB")
             print(f"  Created file size: {file_size_mb:.2f} MB")
-            print(f"  Large file support: {'YES' if file_size_mb > 1 else 'Limited'}")
+            print(f"  Large file support: {'YES' if variable_size_gb > 2 else 'Limited'}")
             
             return True
             
@@ -288,9 +319,10 @@ def test_error_handling():
     with tempfile.TemporaryDirectory() as tmpdir:
         corrupt_file = os.path.join(tmpdir, "corrupt.nc")
         
-        # Create a corrupt file (just random bytes)
+        # Create a corrupt file - the format is identified from the first bytes,
+        # so a few bytes that match no NetCDF/HDF5 signature are enough
         with open(corrupt_file, 'wb') as f:
-            f.write(b'This is not a valid NetCDF file' * 100)
+            f.write(b'\x00' * 8)
         
         try:
             ds = netCDF4.Dataset(corrupt_file, 'r')
@@ -345,7 +377,8 @@ def test_emit_like_file():
                     'f4', 
                     ('downtrack', 'crosstrack', 'bands'),
                     zlib=True,
-                    complevel=4,
+                    complevel=1,
+                    shuffle=True,
                     chunksizes=(128, 128, 28)
                 )
                 
@@ -354,17 +387,22 @@ def test_emit_like_file():
                 reflectance.units = "unitless"
                 reflectance.long_name = "surface reflectance"
                 
-                # Write some data (just first chunk)
-                reflectance[0:10, 0:10, 0:10] = np.random.rand(10, 10, 10)
+                # Write exactly the first chunk - a partial-chunk write makes HDF5
+                # read, decompress, modify and recompress the whole chunk
+                reflectance[0:128, 0:128, 0:28] = np.random.default_rng().random((128, 128, 28), dtype=np.float32)
             
             print(f"✓ Successfully created EMIT-like file")
             
             # Read and validate
+            _drop_cache(test_file)
             with netCDF4.Dataset(test_file, 'r') as ds:
                 assert ds.title == "Test EMIT L2A Reflectance"
                 assert 'reflectance' in ds.variables
                 assert ds.variables['reflectance'].shape == (1280, 1242, 285)
                 
+                # Room for a few ~1.8 MB chunks, so a read isn't evicted from the default 1 MB cache
+                ds.variables['reflectance'].set_var_chunk_cache(size=8 * 1024 * 1024, nelems=1009)
+                
                 # Read sample data
                 sample = ds.variables['reflectance'][0:5, 0:5, 0:5]
                 assert sample.shape == (5, 5, 5)
@@ -379,6 +417,7 @@ def test_emit_like_file():
         except Exception as e:
             print(f"✗ EMIT-like file test failed: {e}")
             import traceback
+            sys.stdout.flush()
             traceback.print_exc()
             return False
 
@@ -407,6 +446,10 @@ def test_environment_variables():
 
 def main():
     """Run all diagnostic tests."""
+    # Buffer whole sections instead of flushing every line - slow when redirected to a network filesystem
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+    
     print("\n" + "=" * 80)
     print("  NetCDF/HDF5 Environment Diagnostic Tool")
     print("  Testing library installation and capabilities")
@@ -444,6 +487,7 @@ def main():
         print("  ✗ SOME TESTS FAILED")
         print("  There may be issues with your NetCDF/HDF5 installation.")
     print("=" * 80 + "\n")
+    sys.stdout.flush()
     
     return 0 if all_passed else 1
 
@@ -7,8 +7,13 @@ import os
 import sys
 import subprocess
 import hashlib
+import multiprocessing as mp
+import time
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
+from _mounts import find_mount
+
 def print_section(title):
     """Print a section header."""
     print(f"\n{'='*80}")
@@ -27,6 +32,56 @@ def check_python_environment():
     print(f"Conda environment: {conda_env}")
     print(f"Virtual environment: {sys.prefix}")
 
+# Seconds to wait for a library probe - a cold import from a network filesystem can be slow
+LIBRARY_PROBE_TIMEOUT = 30
+
+def _probe_libraries(module_name, connection):
+    """Import an HDF5-linked package in a fresh process and send back the native library versions it loaded."""
+    try:
+        if module_name == 'netCDF4':
+            import netCDF4
+            details = [
+                ("NetCDF library version", netCDF4.__netcdf4libversion__),
+                ("HDF5 library version", netCDF4.__hdf5libversion__),
+            ]
+        else:
+            import h5py
+            details = [("HDF5 library version", h5py.version.hdf5_version)]
+        
+        connection.send(('ok', details))
+    except Exception as e:
+        connection.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+def _start_library_probes(module_names):
+    """Start one spawned probe process per package, returning {name: (process, receiving end)}."""
+    context = mp.get_context('spawn')
+    probes = {}
+    
+    for module_name in module_names:
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_probe_libraries, args=(module_name, sender), daemon=True)
+        process.start()
+        sender.close()  # so the receiver sees EOF if the probe dies without sending
+        probes[module_name] = (process, receiver)
+    
+    return probes
+
+def _collect_library_probe(process, receiver, deadline):
+    """Wait for one probe's result, returning (status, details or message)."""
+    try:
+        if not receiver.poll(max(0, deadline - time.monotonic())):
+            process.terminate()
+            return 'error', f"TIMEOUT after {LIBRARY_PROBE_TIMEOUT} s"
+        
+        return receiver.recv()
+    except EOFError:
+        process.join()
+        return 'error', f"CRASHED while loading (exit code {process.exitcode})"
+    finally:
+        receiver.close()
+
 def check_dependencies():
     """Check all required dependencies and their versions."""
     print_section("Dependency Versions")
@@ -39,21 +94,35 @@ def check_dependencies():
         'requests'
     ]
     
+    # Load netCDF4 and h5py each in its own process, concurrently - if they link
+    # conflicting libhdf5 builds, one crashing is reported instead of ending the diagnostic
+    probes = _start_library_probes(['netCDF4', 'h5py'])
+    deadline = time.monotonic() + LIBRARY_PROBE_TIMEOUT
+    hdf5_versions = {}
+    
     for dep in dependencies:
         try:
-            module = __import__(dep)
-            version = getattr(module, '__version__', 'unknown')
-            print(f"✓ {dep}: {version}")
-            
-            # For netCDF4, check the underlying HDF5 library
-            if dep == 'netCDF4':
-                import netCDF4
-                print(f"  - NetCDF library version: {netCDF4.__netcdf4libversion__}")
-                print(f"  - HDF5 library version: {netCDF4.__hdf5libversion__}")
-        except ImportError as e:
+            # read the installed version from package metadata rather than importing
+            # the package, which for h5py/netCDF4 means loading the HDF5 library
+            print(f"✓ {dep}: {version(dep)}")
+        except PackageNotFoundError as e:
             print(f"✗ {dep}: NOT INSTALLED - {e}")
         except Exception as e:
             print(f"✗ {dep}: ERROR - {e}")
+        
+        if dep in probes:
+            status, details = _collect_library_probe(*probes[dep], deadline)
+            
+            if status == 'ok':
+                for label, value in details:
+                    print(f"  - {label}: {value}")
+                
+                hdf5_versions[dep] = dict(details)["HDF5 library version"]
+            else:
+                print(f"  - Could not load {dep}: {details}")
+    
+    if len(set(hdf5_versions.values())) > 1:
+        print(f"\n⚠ netCDF4 and h5py use different HDF5 libraries: {hdf5_versions}")
 
 def check_filesystem(path):
     """Check filesystem properties."""
@@ -70,14 +139,24 @@ def check_filesystem(path):
     print(f"Is directory: {path_obj.is_dir()}")
     print(f"Is writable: {os.access(path, os.W_OK)}")
     
-    # Get filesystem type (Unix-like systems)
-    try:
-        if sys.platform != 'win32':
-            result = subprocess.run(['df', '-T', str(path)], 
-                                  capture_output=True, text=True, timeout=5)
-            print(f"\nFilesystem info:\n{result.stdout}")
-    except Exception as e:
-        print(f"Could not determine filesystem type: {e}")
+    # Get filesystem type - from the mount table where there is one, since df
+    # can hang on an unresponsive network mount
+    mount = find_mount(os.path.realpath(path))
+    
+    if mount is not None:
+        mount_point, fstype, device = mount
+        print(f"\nFilesystem info:")
+        print(f"  Type: {fstype}")
+        print(f"  Mounted on: {mount_point}")
+        print(f"  Device: {device}")
+    else:
+        try:
+            if sys.platform != 'win32':
+                result = subprocess.run(['df', '-T', str(path)], 
+                                      capture_output=True, text=True, timeout=5)
+                print(f"\nFilesystem info:\n{result.stdout}")
+        except Exception as e:
+            print(f"Could not determine filesystem type: {e}")
     
     # Check disk space
     try:
@@ -88,13 +167,19 @@ def check_filesystem(path):
         print(f"Could not determine free space: {e}")
 
 def compute_checksum(filepath):
-    """Compute MD5 checksum of a file."""
-    md5 = hashlib.md5()
+    """Compute SHA-256 checksum of a file."""
     try:
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                md5.update(chunk)
-        return md5.hexdigest()
+        with open(filepath, 'rb', buffering=0) as f:
+            # file_digest (Python 3.11+) hashes in C; SHA-256 uses the CPU's SHA extensions where present
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            
+            # read into one reused 1 MiB buffer rather than allocating a bytes object per chunk
+            sha256 = hashlib.sha256()
+            buffer = memoryview(bytearray(1 << 20))
+            while n := f.readinto(buffer):
+                sha256.update(buffer[:n])
+            return sha256.hexdigest()
     except Exception as e:
         return f"ERROR: {e}"
 
@@ -104,10 +189,18 @@ def test_netcdf_operations(filepath):
     
     import netCDF4
     
-    # Test 1: Check if file exists and is readable
-    print(f"1. File exists: {os.path.exists(filepath)}")
-    print(f"   File size: {os.path.getsize(filepath) / (1024**2):.2f} MB")
-    print(f"   File checksum: {compute_checksum(filepath)}")
+    # Test 1: Check if file exists and is readable - one stat answers both
+    try:
+        file_size = os.stat(filepath).st_size
+    except FileNotFoundError:
+        print(f"1. File exists: False")
+        return False
+    
+    print(f"1. File exists: True")
+    print(f"   File size: {file_size / (1024**2):.2f} MB")
+    # Hashing reads the whole file first, so the netCDF4, h5py and ncdump
+    # opens below are served from the page cache rather than the filesystem
+    print(f"   File checksum (SHA-256): {compute_checksum(filepath)}")
     
     # Test 2: Try to open with netCDF4
     print("\n2. Opening with netCDF4...")
@@ -253,8 +346,8 @@ def main():
         # Try to open with EMITL2ARFL
         print("\nTesting with EMITL2ARFL package...")
         try:
-            from EMITL2ARFL.validate_NetCDF_file import validate_NetCDF_file
-            if validate_NetCDF_file(filepath):
+            from EMITL2ARFL.validate_NetCDF_file import is_valid_NetCDF_file
+            if is_valid_NetCDF_file(filepath):
                 print("✓ EMITL2ARFL validation PASSED")
             else:
                 print("✗ EMITL2ARFL validation FAILED")
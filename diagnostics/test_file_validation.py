@@ -1,5 +1,4 @@
 import sys
-from os.path import expanduser
 
 from EMITL2ARFL import validate_NetCDF_file
 
@@ -9,7 +9,10 @@ IMPORTANT: For best results on HPC systems, set the environment variable
 BEFORE running the script:
 
     export HDF5_USE_FILE_LOCKING=FALSE
-    python test_file_validation_hpc.py
+    python test_file_validation_hpc.py [netcdf_file_or_directory ...]
+
+Several files, or directories of .nc files, can be given; they are
+validated concurrently.
 
 Or in a single command:
 
@@ -20,6 +23,7 @@ it may not work if netCDF4 has already been imported elsewhere.
 """
 
 import os
+import stat
 import sys
 from pathlib import Path
 
@@ -47,46 +51,101 @@ if 'netCDF4' in sys.modules:
     print()
 
 # Now import EMITL2ARFL
-from EMITL2ARFL import validate_NetCDF_file
+from EMITL2ARFL import validate_NetCDF_files
+from EMITL2ARFL.constants import HDF5_SIGNATURE, NETCDF_CLASSIC_SIGNATURES
 
-filename = "~/data/EMIT_L2A_RFL_001_20230129T004447_2302816_003.nc"
+# Files to validate: any given on the command line - a directory means every .nc
+# file in it - otherwise the sample granule
+arguments = sys.argv[1:] or ["~/data/EMIT_L2A_RFL_001_20230129T004447_2302816_003.nc"]
+filepaths = []
+stats = {}
 
-# WORKAROUND 2: Ensure path is fully resolved
-filepath = Path(os.path.expanduser(filename)).resolve()
-print(f"\nValidating file: {filepath}")
-print(f"File exists: {filepath.exists()}")
-if filepath.exists():
-    print(f"File size: {filepath.stat().st_size:,} bytes")
-else:
-    print(f"ERROR: File does not exist at {filepath}")
-    print(f"Please update the 'filename' variable in this script to point to a valid NetCDF file")
-    sys.exit(1)
+for argument in arguments:
+    # WORKAROUND 2: Ensure paths are absolute. absolute() only prepends the working
+    # directory, where resolve() would readlink/stat every component on the filesystem
+    path = Path(argument).expanduser().absolute()
+    
+    # One stat per argument answers whether it exists, whether it's a directory and its size
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        print(f"ERROR: File does not exist at {path}")
+        print(f"Please pass the path of a valid NetCDF file or directory as an argument")
+        sys.exit(1)
+    
+    if stat.S_ISDIR(st.st_mode):
+        # The directory is resolved once and its entries joined onto it; scandir's
+        # entry types avoid a separate existence/type check per file
+        with os.scandir(path) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if entry.name.endswith('.nc') and entry.is_file():
+                    filepath = path / entry.name
+                    filepaths.append(filepath)
+                    stats[filepath] = entry.stat()
+    else:
+        filepaths.append(path)
+        stats[path] = st
+
+for filepath in filepaths:
+    print(f"\nValidating file: {filepath}")
+    print(f"File size: {stats[filepath].st_size:,} bytes")
+
+# Validate every file at once - each on its own thread, so the per-file
+# metadata round-trips to the network filesystem overlap
+print(f"\nAttempting validation of {len(filepaths)} file(s)...")
+errors = validate_NetCDF_files({filepath: "NetCDF" for filepath in filepaths}, stats=stats)
+failed = {filepath: e for filepath, e in errors.items() if e is not None}
 
-print("\nAttempting validation...")
-try:
-    validate_NetCDF_file(str(filepath))
-    print(f"✓ SUCCESS: Valid NetCDF file")
-except Exception as e:
-    print(f"✗ FAILED: Validation error")
-    print(f"  Error type: {type(e).__name__}")
-    print(f"  Error message: {e}")
+for filepath, e in errors.items():
+    if e is None:
+        print(f"✓ SUCCESS: Valid NetCDF file: {filepath}")
+    else:
+        print(f"✗ FAILED: Validation error: {filepath}")
+        print(f"  Error type: {type(e).__name__}")
+        print(f"  Error message: {e}")
+
+if failed:
     print()
     
     # Additional debugging - try direct access
     print("Attempting direct netCDF4 access for debugging...")
-    try:
-        import netCDF4
-        print(f"  netCDF4 version: {netCDF4.__version__}")
-        print(f"  Attempting to open file...")
-        with netCDF4.Dataset(str(filepath), 'r') as ds:
-            print(f"  ✓ Direct netCDF4 access WORKS!")
-            print(f"    Dimensions: {len(ds.dimensions)}, Variables: {len(ds.variables)}")
-            print()
-            print("  This suggests the issue is in the validate_NetCDF_file function,")
-            print("  not with HDF5 file locking.")
-    except Exception as e2:
-        print(f"  ✗ Direct netCDF4 access also FAILS: {e2}")
-        print()
+    import netCDF4
+    print(f"  netCDF4 version: {netCDF4.__version__}")
+    direct_access_works = True
+    not_netcdf = 0
+    
+    for filepath in failed:
+        # A file without a NetCDF signature fails in any library, so don't spend a
+        # full HDF5 open on it - its header alone shows the data is bad, not the locking
+        try:
+            with open(filepath, 'rb', buffering=0) as f:
+                signature = f.read(len(HDF5_SIGNATURE))
+        except OSError as e2:
+            signature = b''
+            print(f"  ✗ Cannot read {filepath.name}: {e2}")
+        
+        if signature != HDF5_SIGNATURE and not signature.startswith(NETCDF_CLASSIC_SIGNATURES):
+            print(f"  ✗ {filepath.name} has no HDF5/NetCDF signature - corrupt or incomplete, re-download it")
+            not_netcdf += 1
+            continue
+        
+        print(f"  Attempting to open {filepath.name}...")
+        try:
+            with netCDF4.Dataset(str(filepath), 'r') as ds:
+                print(f"  ✓ Direct netCDF4 access WORKS!")
+                print(f"    Dimensions: {len(ds.dimensions)}, Variables: {len(ds.variables)}")
+        except Exception as e2:
+            print(f"  ✗ Direct netCDF4 access also FAILS: {e2}")
+            direct_access_works = False
+    
+    print()
+    
+    if not_netcdf == len(failed):
+        print("  None of the failed files are NetCDF files, so HDF5 file locking is not the cause.")
+    elif direct_access_works:
+        print("  This suggests the issue is in the validate_NetCDF_file function,")
+        print("  not with HDF5 file locking.")
+    else:
         print("  RECOMMENDATION:")
         print("  1. Make sure HDF5_USE_FILE_LOCKING=FALSE is set BEFORE running Python:")
         print("     $ export HDF5_USE_FILE_LOCKING=FALSE")
@@ -46,7 +46,9 @@ def main():
             remote_granule=granules[0],
             download_directory=download_dir,
             max_retries=3,
-            retry_delay=2.0
+            retry_delay=2.0,
+            threads=3,  # reflectance, mask and uncertainty side by side
+            range_segments=8
         )
         
         logger.info("✓ SUCCESS!")
@@ -2,12 +2,122 @@
 """
 Verify that EMITL2ARFL is using the correct HDF5/NetCDF libraries.
 This ensures no conflicts with system libraries on HPC systems.
+
+Run with --json to print the findings as a single JSON line instead, e.g. for a
+job prolog to parse:
+
+    python verify_installation.py --json
 """
 
+import json
 import sys
 import os
 from pathlib import Path
 
+
+def collect_installation_info():
+    """Import each library once and gather every version, path and setting checked below."""
+    python_path = Path(sys.executable).parent.parent
+    info = {
+        "executable": sys.executable,
+        "python": sys.version.split()[0],
+        "conda_prefix": os.environ.get('CONDA_PREFIX'),
+        "virtual_env": os.environ.get('VIRTUAL_ENV'),
+        "hdf5_use_file_locking": os.environ.get('HDF5_USE_FILE_LOCKING', '<not set>'),
+        "environment_prefix": str(python_path),
+        "missing": {},
+    }
+
+    try:
+        import h5py
+        info["h5py"] = {
+            "version": h5py.__version__,
+            "hdf5": h5py.version.hdf5_version,
+            "location": str(Path(h5py.__file__)),
+        }
+    except ImportError as e:
+        info["missing"]["h5py"] = str(e)
+
+    try:
+        import netCDF4
+        info["netCDF4"] = {
+            "version": netCDF4.__version__,
+            "location": str(Path(netCDF4.__file__)),
+        }
+
+        # Native library versions, when the extension module reports them
+        try:
+            import netCDF4._netCDF4 as nc4
+            if hasattr(nc4, '__hdf5libversion__'):
+                info["netCDF4"]["hdf5"] = nc4.__hdf5libversion__
+            if hasattr(nc4, '__netcdf4libversion__'):
+                info["netCDF4"]["netcdf"] = nc4.__netcdf4libversion__
+        except Exception:
+            pass
+    except ImportError as e:
+        info["missing"]["netCDF4"] = str(e)
+
+    try:
+        import EMITL2ARFL
+        info["EMITL2ARFL"] = {
+            "version": EMITL2ARFL.__version__,
+            "location": str(Path(EMITL2ARFL.__file__)),
+        }
+    except ImportError as e:
+        info["missing"]["EMITL2ARFL"] = str(e)
+
+    for name in ("h5py", "netCDF4"):
+        if name in info:
+            info[name]["in_environment"] = info["environment_prefix"] in info[name]["location"]
+
+    return info
+
+
+def find_problems(info):
+    """List (problem, recommendation lines) pairs for the installation described by info."""
+    problems = []
+
+    # Check 1: In environment
+    if info["conda_prefix"] is None and info["virtual_env"] is None:
+        problems.append(("Not in conda environment or virtualenv", [
+            "Recommendation: conda create -n EMITL2ARFL python=3.10",
+        ]))
+
+    # Check 2: HDF5 locking
+    if info["hdf5_use_file_locking"] != 'FALSE':
+        problems.append(("HDF5_USE_FILE_LOCKING not set to FALSE", [
+            "Recommendation: set -Ux HDF5_USE_FILE_LOCKING FALSE  (fish)",
+            "Or: export HDF5_USE_FILE_LOCKING=FALSE  (bash, in ~/.bashrc)",
+        ]))
+
+    # Check 3: Libraries installed, and from this environment
+    if info["missing"]:
+        error = next(iter(info["missing"].values()))
+        problems.append((f"Missing required package: {error}", [
+            "Recommendation: Follow INSTALL_HPC.md instructions",
+        ]))
+    else:
+        if not info["h5py"]["in_environment"]:
+            problems.append(("h5py not from your Python environment", [
+                "Recommendation: conda install -c conda-forge h5py",
+            ]))
+
+        if not info["netCDF4"]["in_environment"]:
+            problems.append(("netCDF4 not from your Python environment", [
+                "Recommendation: conda install -c conda-forge netcdf4",
+            ]))
+
+    return problems
+
+
+info = collect_installation_info()
+problems = find_problems(info)
+
+if "--json" in sys.argv[1:]:
+    info["problems"] = [problem for problem, _ in problems]
+    print(json.dumps(info))
+    sys.exit(1 if problems else 0)
+
 print("=" * 70)
 print("EMITL2ARFL Installation Verification")
 print("=" * 70)
@@ -15,21 +125,21 @@ print()
 
 # Check Python location
 print("Python:")
-print(f"  Executable: {sys.executable}")
-print(f"  Version: {sys.version.split()[0]}")
+print(f"  Executable: {info['executable']}")
+print(f"  Version: {info['python']}")
 
 # Check if in conda environment
-if 'CONDA_PREFIX' in os.environ:
-    print(f"  Conda env: {os.environ['CONDA_PREFIX']}")
-elif 'VIRTUAL_ENV' in os.environ:
-    print(f"  Venv: {os.environ['VIRTUAL_ENV']}")
+if info["conda_prefix"] is not None:
+    print(f"  Conda env: {info['conda_prefix']}")
+elif info["virtual_env"] is not None:
+    print(f"  Venv: {info['virtual_env']}")
 else:
     print("  ⚠️  WARNING: Not in conda env or virtualenv")
 print()
 
 # Check critical environment variable
 print("Environment:")
-hdf5_locking = os.environ.get('HDF5_USE_FILE_LOCKING', '<not set>')
+hdf5_locking = info["hdf5_use_file_locking"]
 if hdf5_locking == 'FALSE':
     print(f"  ✓ HDF5_USE_FILE_LOCKING: {hdf5_locking}")
 else:
@@ -39,69 +149,55 @@ print()
 
 # Check h5py
 print("h5py:")
-try:
-    import h5py
-    h5py_path = Path(h5py.__file__)
-    python_path = Path(sys.executable).parent.parent
-    
-    is_in_env = str(python_path) in str(h5py_path)
-    status = "✓" if is_in_env else "⚠️ "
-    
-    print(f"  {status} Version: {h5py.__version__}")
-    print(f"  {status} HDF5 lib: {h5py.version.hdf5_version}")
-    print(f"  {status} Location: {h5py_path}")
-    
-    if not is_in_env:
+if "h5py" in info:
+    h5py_info = info["h5py"]
+    status = "✓" if h5py_info["in_environment"] else "⚠️ "
+
+    print(f"  {status} Version: {h5py_info['version']}")
+    print(f"  {status} HDF5 lib: {h5py_info['hdf5']}")
+    print(f"  {status} Location: {h5py_info['location']}")
+
+    if not h5py_info["in_environment"]:
         print(f"     WARNING: h5py not from your Python environment!")
-        print(f"     Expected path containing: {python_path}")
-except ImportError as e:
-    print(f"  ✗ Not installed: {e}")
+        print(f"     Expected path containing: {info['environment_prefix']}")
+else:
+    print(f"  ✗ Not installed: {info['missing']['h5py']}")
 print()
 
 # Check netCDF4
 print("netCDF4:")
-try:
-    import netCDF4
-    nc4_path = Path(netCDF4.__file__)
-    python_path = Path(sys.executable).parent.parent
-    
-    is_in_env = str(python_path) in str(nc4_path)
-    status = "✓" if is_in_env else "⚠️ "
-    
-    print(f"  {status} Version: {netCDF4.__version__}")
-    print(f"  {status} Location: {nc4_path}")
-    
-    # Try to get HDF5 version from netCDF4
-    try:
-        import netCDF4._netCDF4 as nc4
-        if hasattr(nc4, '__hdf5libversion__'):
-            print(f"  {status} HDF5 lib: {nc4.__hdf5libversion__}")
-        if hasattr(nc4, '__netcdf4libversion__'):
-            print(f"  {status} NetCDF lib: {nc4.__netcdf4libversion__}")
-    except Exception:
-        pass
-    
-    if not is_in_env:
+if "netCDF4" in info:
+    nc4_info = info["netCDF4"]
+    status = "✓" if nc4_info["in_environment"] else "⚠️ "
+
+    print(f"  {status} Version: {nc4_info['version']}")
+    print(f"  {status} Location: {nc4_info['location']}")
+
+    if "hdf5" in nc4_info:
+        print(f"  {status} HDF5 lib: {nc4_info['hdf5']}")
+    if "netcdf" in nc4_info:
+        print(f"  {status} NetCDF lib: {nc4_info['netcdf']}")
+
+    if not nc4_info["in_environment"]:
         print(f"     WARNING: netCDF4 not from your Python environment!")
-        print(f"     Expected path containing: {python_path}")
-except ImportError as e:
-    print(f"  ✗ Not installed: {e}")
+        print(f"     Expected path containing: {info['environment_prefix']}")
+else:
+    print(f"  ✗ Not installed: {info['missing']['netCDF4']}")
 print()
 
 # Check EMITL2ARFL
 print("EMITL2ARFL:")
-try:
-    import EMITL2ARFL
-    emit_path = Path(EMITL2ARFL.__file__)
-    
-    print(f"  ✓ Version: {EMITL2ARFL.__version__}")
-    print(f"  ✓ Location: {emit_path}")
-    
+if "EMITL2ARFL" in info:
+    emit_info = info["EMITL2ARFL"]
+
+    print(f"  ✓ Version: {emit_info['version']}")
+    print(f"  ✓ Location: {emit_info['location']}")
+
     # Check if it's editable install
-    if 'site-packages' not in str(emit_path):
+    if 'site-packages' not in emit_info["location"]:
         print(f"     (editable/development install)")
-except ImportError as e:
-    print(f"  ✗ Not installed: {e}")
+else:
+    print(f"  ✗ Not installed: {info['missing']['EMITL2ARFL']}")
 print()
 
 # Summary
@@ -109,48 +205,12 @@ print("=" * 70)
 print("Summary:")
 print("=" * 70)
 
-all_good = True
-
-# Check 1: In environment
-if 'CONDA_PREFIX' not in os.environ and 'VIRTUAL_ENV' not in os.environ:
-    print("✗ Not in conda environment or virtualenv")
-    print("  Recommendation: conda create -n EMITL2ARFL python=3.10")
-    all_good = False
-
-# Check 2: HDF5 locking
-if hdf5_locking != 'FALSE':
-    print("✗ HDF5_USE_FILE_LOCKING not set to FALSE")
-    print("  Recommendation: set -Ux HDF5_USE_FILE_LOCKING FALSE  (fish)")
-    print("  Or: export HDF5_USE_FILE_LOCKING=FALSE  (bash, in ~/.bashrc)")
-    all_good = False
-
-# Check 3: Libraries installed
-try:
-    import h5py
-    import netCDF4
-    import EMITL2ARFL
-    
-    # Check if from environment
-    h5py_path = Path(h5py.__file__)
-    nc4_path = Path(netCDF4.__file__)
-    python_path = Path(sys.executable).parent.parent
-    
-    if str(python_path) not in str(h5py_path):
-        print("✗ h5py not from your Python environment")
-        print("  Recommendation: conda install -c conda-forge h5py")
-        all_good = False
-    
-    if str(python_path) not in str(nc4_path):
-        print("✗ netCDF4 not from your Python environment")
-        print("  Recommendation: conda install -c conda-forge netcdf4")
-        all_good = False
-        
-except ImportError as e:
-    print(f"✗ Missing required package: {e}")
-    print("  Recommendation: Follow INSTALL_HPC.md instructions")
-    all_good = False
-
-if all_good:
+for problem, recommendations in problems:
+    print(f"✗ {problem}")
+    for recommendation in recommendations:
+        print(f"  {recommendation}")
+
+if not problems:
     print("✓ Installation looks good!")
     print()
     print("Next steps:")
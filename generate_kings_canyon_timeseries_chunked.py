@@ -3,11 +3,19 @@ Generate EMIT L2A Reflectance time series for Kings Canyon area in chunks.
 
 This script processes the data in yearly chunks to avoid memory issues on systems
 with limited RAM (e.g., 1 GB). Run this script multiple times with different year
-parameters, or let it process all years sequentially.
+parameters, or let it process all years sequentially. On machines with more memory,
+set PARALLEL_YEARS to process several years at once in separate processes.
 """
 
+import hashlib
+import json
 import logging
-from os.path import join
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os.path import join, exists, expanduser
 import sys
 
 import earthaccess
@@ -22,6 +30,9 @@ from EMITL2ARFL import *
 
 # Configuration parameters
 YEARS_TO_PROCESS = [2022, 2023, 2024, 2025]  # Add/remove years as needed
+# Years processed at once, each in its own process. Every worker holds its own
+# year's data, so only raise this on systems with memory to spare.
+PARALLEL_YEARS = 1
 download_directory = "/tmp/EMIT_download"
 output_directory = "~/data/Kings Canyon EMIT"
 
@@ -42,10 +53,33 @@ logger.info(f"Raster grid: {grid}")
 logger.info("Logging into earthaccess...")
 earthaccess.login(strategy="netrc", persist=True)
 
-# Process each year separately
-all_filenames = []
-for year in YEARS_TO_PROCESS:
-    # Determine date range for this year
+def manifest_filename(start_date, end_date):
+    """Manifest recording the outputs of a completed year, keyed by its dates and grid."""
+    key = hashlib.blake2b(f"{start_date}:{end_date}:{bbox_UTM}:{grid.cell_size}".encode()).hexdigest()[:16]
+    return join(expanduser(output_directory), f".manifest_{key}.json")
+
+def read_manifest(filename):
+    """Output filenames from a year's manifest, or None if it is missing or any output has gone."""
+    try:
+        with open(filename) as f:
+            filenames = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    return filenames if all(exists(expanduser(f)) for f in filenames) else None
+
+def write_manifest(filename, filenames):
+    """Write a year's manifest atomically, so an interrupted run never leaves a partial one."""
+    temporary_filename = f"{filename}.tmp"
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    
+    with open(temporary_filename, "w") as f:
+        json.dump(filenames, f)
+    
+    os.replace(temporary_filename, filename)
+
+def year_dates(year):
+    """Start and end dates to process for a year."""
     if year == 2022:
         start_date = "2022-08-01"  # EMIT started in August 2022
     else:
@@ -56,28 +90,88 @@ for year in YEARS_TO_PROCESS:
     else:
         end_date = f"{year}-12-31"
     
+    return start_date, end_date
+
+def process_year(year):
+    """Generate one year's time series, skipping it if an earlier run already finished it."""
+    start_date, end_date = year_dates(year)
+    
     logger.info(f"\n{'='*60}")
     logger.info(f"Processing year {year}: {start_date} to {end_date}")
     logger.info(f"{'='*60}\n")
     
+    # A year finished by an earlier run is skipped without searching CMR again
+    manifest = manifest_filename(start_date, end_date)
+    filenames = read_manifest(manifest)
+    
+    if filenames is not None:
+        logger.info(f"Year {year} already complete ({len(filenames)} files), skipping")
+        return filenames
+    
+    # Generate EMIT L2A reflectance time series for this year. Only a year covered by the
+    # search above reuses its granules - any other is searched afresh rather than run
+    # against an empty list, which would record a manifest for a year never searched.
+    filenames = generate_EMIT_L2A_RFL_timeseries(
+        start_date_UTC=start_date,
+        end_date_UTC=end_date,
+        geometry=grid,
+        download_directory=download_directory,
+        output_directory=output_directory,
+        search_results=granules_by_year.get(year, []) if year in searched_years else None
+    )
+    
+    logger.info(f"Generated {len(filenames)} files for year {year}")
+    write_manifest(manifest, filenames)
+    
+    return filenames
+
+# Search CMR once across every year still to process, rather than once per year,
+# and split the granules by every year they overlap. The search pages through every result
+# (or raises), so a year's granules are complete once they are in granules_by_year.
+pending_years = [
+    year for year in YEARS_TO_PROCESS
+    if read_manifest(manifest_filename(*year_dates(year))) is None
+]
+granules_by_year = defaultdict(list)
+searched_years = set()
+
+if pending_years:
+    logger.info(f"Searching for granules for years {pending_years}...")
+    search_results = search_EMIT_L2A_RFL_granules(
+        start_UTC=min(year_dates(year)[0] for year in pending_years),
+        end_UTC=max(year_dates(year)[1] for year in pending_years),
+        geometry=grid
+    )
+    
+    for search_result in search_results:
+        # a scene crossing midnight on New Year's Eve belongs to both years
+        for year in sorted({acquisition_date.year for acquisition_date in granule_dates(search_result)}):
+            granules_by_year[year].append(search_result)
+    
+    searched_years.update(pending_years)
+    logger.info(f"Found {len(search_results)} granules")
+
+# Process each year separately, or PARALLEL_YEARS at a time in worker processes
+if PARALLEL_YEARS > 1:
+    # fork, so workers inherit the grid and the earthaccess login instead of rebuilding them
+    executor = ProcessPoolExecutor(max_workers=PARALLEL_YEARS, mp_context=multiprocessing.get_context("fork"))
+    results = [(year, executor.submit(process_year, year).result) for year in YEARS_TO_PROCESS]
+else:
+    executor = None
+    results = [(year, partial(process_year, year)) for year in YEARS_TO_PROCESS]
+
+all_filenames = []
+for year, result in results:
     try:
-        # Generate EMIT L2A reflectance time series for this year
-        filenames = generate_EMIT_L2A_RFL_timeseries(
-            start_date_UTC=start_date,
-            end_date_UTC=end_date,
-            geometry=grid,
-            download_directory=download_directory,
-            output_directory=output_directory
-        )
-        
-        logger.info(f"Generated {len(filenames)} files for year {year}")
-        all_filenames.extend(filenames)
-        
+        all_filenames.extend(result())
     except Exception as e:
         logger.error(f"Error processing year {year}: {e}")
         logger.error("Continuing with next year...")
         continue
 
+if executor is not None:
+    executor.shutdown()
+
 # Summary
 logger.info(f"\n{'='*60}")
 logger.info(f"PROCESSING COMPLETE")
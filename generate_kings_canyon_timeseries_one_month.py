@@ -52,9 +52,8 @@ filenames = generate_EMIT_L2A_RFL_timeseries(
     output_directory=output_directory
 )
 
-logger.info(f"Generated {len(filenames)} files:")
-for filename in filenames:
-    logger.info(f"  {filename}")
+# one record for the whole list rather than one per file
+logger.info("\n".join([f"Generated {len(filenames)} files:"] + [f"  {filename}" for filename in filenames]))
 
 logger.info("\nTime series generation complete!")
 
@@ -0,0 +1,31 @@
+import importlib
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+# Imported before any test module, so the package configures HDF5 file locking
+# before a test's own `import netCDF4` loads HDF5
+import EMITL2ARFL
+
+DIAGNOSTICS_DIRECTORY = Path(__file__).resolve().parent.parent / "diagnostics"
+
+
+def package_module(name: str) -> ModuleType:
+    """
+    Import a module of the package by name, e.g. package_module("download_file_ranges").
+
+    The package re-exports each function under its module's name, so
+    `EMITL2ARFL.download_file_ranges` is the function rather than the module. Tests that
+    monkeypatch a module's globals or reach its private helpers get it from here.
+    """
+    return importlib.import_module(f"EMITL2ARFL.{name}")
+
+
+def diagnostics_module(name: str) -> ModuleType:
+    """
+    Load one of the standalone diagnostics scripts as a module, e.g. diagnostics_module("clean_cache").
+    """
+    spec = importlib.util.spec_from_file_location(name, DIAGNOSTICS_DIRECTORY / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
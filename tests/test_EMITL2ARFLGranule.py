@@ -0,0 +1,23 @@
+import netCDF4
+
+from EMITL2ARFL import EMITL2ARFLGranule
+
+
+def test_reflectance_dataset_is_opened_once_and_closed_on_exit(tmp_path):
+    filename = str(tmp_path / "reflectance.nc")
+
+    with netCDF4.Dataset(filename, "w") as ds:
+        ds.createDimension("x", 2)
+        ds.createVariable("reflectance", "f4", ("x",))[:] = [0.1, 0.2]
+
+    granule = EMITL2ARFLGranule(filename, filename, filename)
+    # nothing is opened until the first read
+    assert granule.reflectance_ds is None
+
+    with granule:
+        dataset = granule.reflectance_dataset
+        assert dataset.isopen()
+        assert granule.reflectance_dataset is dataset
+
+    assert not dataset.isopen()
+    assert granule.reflectance_ds is None
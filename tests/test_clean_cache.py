@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import netCDF4
+import pytest
+
+from EMITL2ARFL.exceptions import NetCDFCorruptedError, NetCDFHDFCorruptionError, NetCDFReadError
+from EMITL2ARFL.file_utils import VALIDATION_MARKER_FILENAME
+
+from conftest import diagnostics_module
+
+clean_cache = diagnostics_module("clean_cache")
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.execute(
+        "CREATE TABLE v(path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, status TEXT, err TEXT)"
+    )
+    yield connection
+    connection.close()
+
+
+def test_only_corruption_is_cached_as_a_failure(connection):
+    results = [
+        clean_cache.ValidationResult(Path("/cache/valid.nc"), 10, 1, None, False),
+        clean_cache.ValidationResult(Path("/cache/corrupt.nc"), 10, 1, NetCDFHDFCorruptionError("bad"), False),
+        clean_cache.ValidationResult(Path("/cache/stale.nc"), 10, 1, NetCDFReadError("ESTALE"), False),
+        clean_cache.ValidationResult(Path("/cache/eio.nc"), 10, 1, OSError(5, "EIO"), False),
+    ]
+
+    clean_cache._save_validation_cache(connection, results)
+
+    rows = {path: (status, err) for path, status, err in connection.execute("SELECT path, status, err FROM v")}
+    assert rows == {
+        "/cache/valid.nc": ("ok", None),
+        "/cache/corrupt.nc": ("bad", "NetCDFHDFCorruptionError"),
+    }
+
+
+def test_recorded_checksums_are_only_verified_on_request(tmp_path):
+    filename = str(tmp_path / "reflectance.nc")
+
+    with netCDF4.Dataset(filename, "w") as ds:
+        ds.createDimension("x", 2)
+        ds.createVariable("reflectance", "f4", ("x",))[:] = [0.1, 0.2]
+
+    st = os.stat(filename)
+    marker = {"reflectance.nc": [st.st_size, st.st_mtime_ns, "md5:0123456789abcdef"]}
+    (tmp_path / VALIDATION_MARKER_FILENAME).write_text(json.dumps(marker))
+
+    with os.scandir(tmp_path) as entries:
+        entry = next(entry for entry in entries if entry.name == "reflectance.nc")
+
+    # the header check passes without reading the whole file
+    assert clean_cache._validate_one(entry, {}).error is None
+
+    error = clean_cache._validate_one(entry, {}, verify_checksums=True).error
+    assert isinstance(error, NetCDFCorruptedError)
+    assert "md5 checksum" in str(error)
+
+
+def test_directories_emptied_by_deletion_collapse_up_to_the_cache_root(monkeypatch, tmp_path):
+    monkeypatch.setenv("EMIT_SKIP_VALIDATION_CACHE", "1")
+    monkeypatch.setattr("builtins.input", lambda prompt: "yes")
+    cache = tmp_path / "cache"
+
+    for corrupt in ["2023/01/a/reflectance.nc", "2023/01/b/mask/mask.nc", "2024/05/reflectance.nc"]:
+        (cache / corrupt).parent.mkdir(parents=True, exist_ok=True)
+        (cache / corrupt).write_bytes(b"<html>503</html>")
+
+    (cache / "2023/02").mkdir(parents=True)
+
+    with netCDF4.Dataset(str(cache / "2023/02/reflectance.nc"), "w") as ds:
+        ds.createDimension("x", 2)
+
+    # not a NetCDF file, so it keeps its directory
+    (cache / "2024/notes.txt").write_text("keep")
+
+    clean_cache.clean_cache_directory(cache)
+
+    remaining = sorted(str(path.relative_to(cache)) for path in cache.rglob("*"))
+    assert remaining == ["2023", "2023/02", "2023/02/reflectance.nc", "2024", "2024/notes.txt"]
+
+
+def test_cache_root_is_kept_when_everything_is_deleted(monkeypatch, tmp_path):
+    monkeypatch.setenv("EMIT_SKIP_VALIDATION_CACHE", "1")
+    monkeypatch.setattr("builtins.input", lambda prompt: "yes")
+    corrupt = tmp_path / "cache" / "2023" / "01" / "reflectance.nc"
+    corrupt.parent.mkdir(parents=True)
+    corrupt.write_bytes(b"<html>503</html>")
+
+    clean_cache.clean_cache_directory(tmp_path / "cache")
+
+    assert (tmp_path / "cache").is_dir()
+    assert list((tmp_path / "cache").iterdir()) == []
@@ -0,0 +1,32 @@
+import netCDF4
+
+from EMITL2ARFL import NETCDF_LOCK
+
+from conftest import package_module
+
+diagnose_module = package_module("diagnose_netcdf_issues")
+
+
+def test_directory_structure_reads_hold_the_netcdf_lock(monkeypatch, tmp_path):
+    for i in range(6):
+        with netCDF4.Dataset(str(tmp_path / f"granule_{i}.nc"), "w") as ds:
+            ds.createDimension("x", 2)
+            ds.createVariable("reflectance", "f4", ("x",))[:] = [0.1, 0.2]
+
+    (tmp_path / "truncated.nc").write_bytes(b"\x89HDF\r\n\x1a\n")
+    opened_unlocked = []
+    dataset = netCDF4.Dataset
+
+    def _dataset(filename, *args, **kwargs):
+        if not NETCDF_LOCK.locked():
+            opened_unlocked.append(filename)
+
+        return dataset(filename, *args, **kwargs)
+
+    monkeypatch.setattr(diagnose_module.netCDF4, "Dataset", _dataset)
+
+    results = diagnose_module.diagnose_directory(tmp_path, verbose=False)
+
+    assert [r["valid_netcdf"] for r in results] == [True] * 6 + [False]
+    assert all(r["dimensions"] == {"x": 2} for r in results[:6])
+    assert opened_unlocked == []
@@ -0,0 +1,154 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from EMITL2ARFL import download_file_ranges
+from EMITL2ARFL.constants import DOWNLOAD_RANGE_RESUMES
+
+from conftest import package_module
+
+download_module = package_module("download_file_ranges")
+
+CONTENT = bytes(range(256)) * 64
+
+
+class DataHandler(BaseHTTPRequestHandler):
+    """Stands in for the pre-signed S3 host, which refuses a second auth mechanism."""
+    authorization_headers = []
+
+    def do_GET(self):
+        self.authorization_headers.append(self.headers.get("Authorization"))
+
+        if self.headers.get("Authorization"):
+            self.send_error(400, "Only one auth mechanism allowed")
+            return
+
+        start, end = self.headers["Range"].split("=")[1].split("-")
+        body = CONTENT[int(start):int(end) + 1]
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(CONTENT)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def redirected_url():
+    DataHandler.authorization_headers = []
+    data_server = _serve(DataHandler)
+    # a different hostname for the same loopback address, so requests treats it as another host
+    signed_url = f"http://localhost:{data_server.server_port}/granule.nc?X-Amz-Signature=abc"
+
+    class RedirectHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(307)
+            self.send_header("Location", signed_url)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    login_server = _serve(RedirectHandler)
+    yield f"http://127.0.0.1:{login_server.server_port}/granule.nc"
+    login_server.shutdown()
+    data_server.shutdown()
+
+
+def test_ranges_reach_the_data_host_without_the_bearer_token(redirected_url, tmp_path):
+    filepath = tmp_path / "granule.nc"
+
+    with requests.Session() as session:
+        session.headers["Authorization"] = "Bearer token"
+        download_file_ranges(redirected_url, filepath, session, segments=4)
+
+    assert filepath.read_bytes() == CONTENT
+    # the probe and all four ranges, none of them carrying the token
+    assert len(DataHandler.authorization_headers) == 5
+    assert not any(DataHandler.authorization_headers)
+
+
+class FakeRangeResponse:
+    def __init__(self, start, end, drop_after=None):
+        self.status_code = 206
+        self.headers = {"Content-Range": f"bytes {start}-{end}/{len(CONTENT)}"}
+        self.body = CONTENT[start:end + 1]
+        self.drop_after = drop_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for offset in range(0, len(self.body), 100):
+            if self.drop_after is not None and offset >= self.drop_after:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+            yield self.body[offset:offset + 100]
+
+
+class FlakySession:
+    """Serves byte ranges, dropping each range's connection part way `drops` times."""
+
+    def __init__(self, drops):
+        self.drops = drops
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers, stream, timeout):
+        start, end = (int(value) for value in headers["Range"].split("=")[1].split("-"))
+
+        with self.lock:
+            self.requested.append((start, end))
+            attempts = sum(1 for _, requested_end in self.requested if requested_end == end)
+
+        # the one-byte probe and the final attempt at each range complete
+        drop = end > 0 and attempts <= self.drops
+        return FakeRangeResponse(start, end, drop_after=300 if drop else None)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(download_module.time, "sleep", lambda seconds: None)
+
+
+def test_dropped_ranges_resume_from_their_last_byte(no_backoff, tmp_path):
+    filepath = tmp_path / "granule.nc"
+    session = FlakySession(drops=DOWNLOAD_RANGE_RESUMES)
+
+    download_file_ranges("https://data.example/granule.nc", filepath, session, segments=4)
+
+    assert filepath.read_bytes() == CONTENT
+    segment_size = len(CONTENT) // 4
+    first_range = [requested for requested in session.requested if requested[1] == segment_size - 1]
+    # each attempt picks up 300 bytes further on instead of restarting the range
+    assert first_range == [(300 * attempt, segment_size - 1) for attempt in range(DOWNLOAD_RANGE_RESUMES + 1)]
+
+
+def test_range_that_keeps_dropping_removes_the_partial_file(no_backoff, tmp_path):
+    filepath = tmp_path / "granule.nc"
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download_file_ranges(
+            "https://data.example/granule.nc",
+            filepath,
+            FlakySession(drops=DOWNLOAD_RANGE_RESUMES + 1),
+            segments=4
+        )
+
+    assert not filepath.exists()
@@ -0,0 +1,95 @@
+import json
+import os
+
+import pytest
+
+from conftest import package_module
+
+file_utils = package_module("file_utils")
+
+
+@pytest.fixture(autouse=True)
+def validation_cache_enabled(monkeypatch):
+    monkeypatch.delenv("EMIT_SKIP_VALIDATION_CACHE", raising=False)
+
+
+def _write(path, content=b"granule"):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_downloads_are_not_hashed_without_a_fast_checksum(monkeypatch, tmp_path):
+    monkeypatch.setattr(file_utils, "blake3", None)
+    monkeypatch.setattr(file_utils, "xxhash", None)
+    filepath = _write(tmp_path / "reflectance.nc")
+
+    def _checksum(*args, **kwargs):
+        raise AssertionError("a download was hashed")
+
+    monkeypatch.setattr(file_utils, "compute_file_checksum", _checksum)
+
+    assert file_utils.fast_checksum_algorithm() is None
+    file_utils.write_validation_marker(tmp_path, [filepath], checksum_filepaths=[filepath])
+
+    marker = json.loads((tmp_path / file_utils.VALIDATION_MARKER_FILENAME).read_text())
+    st = os.stat(filepath)
+    assert marker == {"reflectance.nc": [st.st_size, st.st_mtime_ns]}
+    assert file_utils.validation_marker_checksum(filepath) is None
+
+
+def test_downloads_are_hashed_with_a_fast_checksum(monkeypatch, tmp_path):
+    # md5 stands in for blake3/xxhash, which are optional
+    monkeypatch.setattr(file_utils, "fast_checksum_algorithm", lambda: "md5")
+    filepath = _write(tmp_path / "reflectance.nc")
+
+    file_utils.write_validation_marker(tmp_path, [filepath], checksum_filepaths=[filepath])
+
+    assert file_utils.validation_marker_checksum(filepath) == f"md5:{file_utils.compute_file_checksum(filepath, 'md5')}"
+
+
+def test_marker_is_current_until_a_file_changes(tmp_path):
+    reflectance = _write(tmp_path / "reflectance.nc")
+    mask = _write(tmp_path / "mask.nc")
+
+    assert not file_utils.validation_marker_is_current(tmp_path, [reflectance, mask])
+
+    file_utils.write_validation_marker(tmp_path, [reflectance, mask])
+    assert file_utils.validation_marker_is_current(tmp_path, [reflectance, mask])
+
+    # rewritten with different contents - size and mtime no longer match
+    _write(tmp_path / "mask.nc", b"partial")
+    assert not file_utils.validation_marker_is_current(tmp_path, [reflectance, mask])
+    assert file_utils.validation_marker_is_current(tmp_path, [reflectance])
+
+    os.remove(reflectance)
+    assert not file_utils.validation_marker_is_current(tmp_path, [reflectance])
+
+
+def test_marker_can_be_bypassed(monkeypatch, tmp_path):
+    filepath = _write(tmp_path / "reflectance.nc")
+    file_utils.write_validation_marker(tmp_path, [filepath])
+
+    monkeypatch.setenv("EMIT_SKIP_VALIDATION_CACHE", "1")
+
+    assert not file_utils.validation_marker_is_current(tmp_path, [filepath])
+
+
+def test_unreadable_marker_is_not_current(tmp_path):
+    filepath = _write(tmp_path / "reflectance.nc")
+    (tmp_path / file_utils.VALIDATION_MARKER_FILENAME).write_text("{truncated")
+
+    assert not file_utils.validation_marker_is_current(tmp_path, [filepath])
+
+
+def test_rewriting_the_marker_keeps_checksums_of_unchanged_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(file_utils, "fast_checksum_algorithm", lambda: "md5")
+    reflectance = _write(tmp_path / "reflectance.nc")
+    mask = _write(tmp_path / "mask.nc")
+    file_utils.write_validation_marker(tmp_path, [reflectance, mask], checksum_filepaths=[reflectance, mask])
+
+    # mask re-downloaded and validated again, without a checksum this time
+    _write(tmp_path / "mask.nc", b"redownloaded")
+    file_utils.write_validation_marker(tmp_path, [reflectance, mask])
+
+    assert file_utils.validation_marker_checksum(reflectance) == f"md5:{file_utils.compute_file_checksum(reflectance, 'md5')}"
+    assert file_utils.validation_marker_checksum(mask) is None
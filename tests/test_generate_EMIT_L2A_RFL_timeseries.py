@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from conftest import package_module
+
+timeseries_module = package_module("generate_EMIT_L2A_RFL_timeseries")
+
+
+class FakeCube:
+    def to_geotiff(self, filename):
+        open(filename, "w").close()
+
+
+def _patch_retrieve(monkeypatch, fail_on=None):
+    processed = []
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def _retrieve(search_results, date_UTC, **kwargs):
+        with lock:
+            active.append(date_UTC)
+            peak.append(len(active))
+
+        time.sleep(0.01)
+
+        with lock:
+            active.remove(date_UTC)
+            processed.append(date_UTC.strftime("%Y-%m-%d"))
+
+        if date_UTC.strftime("%Y-%m-%d") == fail_on:
+            raise RuntimeError(f"failed on {fail_on}")
+
+        return FakeCube()
+
+    monkeypatch.setattr(timeseries_module, "_retrieve_EMIT_L2A_RFL_from_granules", _retrieve)
+
+    return processed, peak
+
+
+def test_dates_run_one_at_a_time_by_default(monkeypatch, tmp_path):
+    processed, peak = _patch_retrieve(monkeypatch)
+
+    filenames = timeseries_module.generate_EMIT_L2A_RFL_timeseries(
+        start_date_UTC="2023-01-01",
+        end_date_UTC="2023-01-04",
+        geometry=None,
+        output_directory=str(tmp_path),
+        threads=4,
+        search_results=[]
+    )
+
+    assert len(filenames) == 4
+    assert processed == ["2023-01-01", "2023-01-02", "2023-01-03", "2023-01-04"]
+    # granule threads don't spill over into processing several dates at once
+    assert max(peak) == 1
+
+
+def test_failing_date_stops_the_remaining_dates(monkeypatch, tmp_path):
+    processed, _ = _patch_retrieve(monkeypatch, fail_on="2023-01-02")
+
+    with pytest.raises(RuntimeError, match="2023-01-02"):
+        timeseries_module.generate_EMIT_L2A_RFL_timeseries(
+            start_date_UTC="2023-01-01",
+            end_date_UTC="2023-01-10",
+            geometry=None,
+            output_directory=str(tmp_path),
+            search_results=[]
+        )
+
+    assert processed == ["2023-01-01", "2023-01-02"]
+
+
+def test_date_threads_bounds_concurrent_dates(monkeypatch, tmp_path):
+    processed, peak = _patch_retrieve(monkeypatch)
+
+    filenames = timeseries_module.generate_EMIT_L2A_RFL_timeseries(
+        start_date_UTC="2023-01-01",
+        end_date_UTC="2023-01-08",
+        geometry=None,
+        output_directory=str(tmp_path),
+        search_results=[],
+        date_threads=2
+    )
+
+    # returned in date order regardless of completion order
+    assert filenames == sorted(filenames) and len(filenames) == 8
+    assert max(peak) <= 2
+
+
+def _granule(name, beginning, ending):
+    return {"name": name, "umm": {"TemporalExtent": {"RangeDateTime": {
+        "BeginningDateTime": beginning,
+        "EndingDateTime": ending
+    }}}}
+
+
+def test_granule_crossing_midnight_goes_into_both_days(monkeypatch, tmp_path):
+    granules_by_date = {}
+
+    def _retrieve(search_results, date_UTC, **kwargs):
+        granules_by_date[date_UTC.strftime("%Y-%m-%d")] = [granule["name"] for granule in search_results]
+        return FakeCube()
+
+    monkeypatch.setattr(timeseries_module, "_retrieve_EMIT_L2A_RFL_from_granules", _retrieve)
+
+    timeseries_module.generate_EMIT_L2A_RFL_timeseries(
+        start_date_UTC="2023-01-01",
+        end_date_UTC="2023-01-02",
+        geometry=None,
+        output_directory=str(tmp_path),
+        search_results=[
+            _granule("evening", "2023-01-01T18:00:00Z", "2023-01-01T18:00:10Z"),
+            _granule("midnight", "2023-01-01T23:59:55Z", "2023-01-02T00:00:05Z"),
+        ]
+    )
+
+    # the same days a single-date search, which matches on temporal overlap, would find it
+    assert granules_by_date == {
+        "2023-01-01": ["evening", "midnight"],
+        "2023-01-02": ["midnight"]
+    }
@@ -8,8 +8,10 @@ dependencies = [
     "netCDF4",
     "dateutil",
     "rasters",
+    "requests",
     "rioxarray",
     "spectral",
+    "urllib3",
     "xarray"
 ]
 
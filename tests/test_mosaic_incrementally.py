@@ -0,0 +1,97 @@
+import warnings
+
+import numpy as np
+import pytest
+import rasters as rt
+from affine import Affine
+
+from conftest import package_module
+
+retrieve_module = package_module("retrieve_EMIT_L2A_RFL")
+
+GRID = rt.RasterGrid.from_affine(Affine(60, 0, 300000, 0, -60, 4000000), 4, 5, crs="EPSG:32611")
+
+
+def _cube(columns, value):
+    array = np.full((2, 4, 5), np.nan, dtype=np.float32)
+    array[:, :, columns] = value
+    return rt.MultiRaster(array, geometry=GRID)
+
+
+def test_mosaic_incrementally_matches_rasters_mosaic():
+    cubes = [_cube(slice(0, 3), 1), _cube(slice(2, 5), 2)]
+    expected = rt.mosaic(cubes, geometry=GRID)
+
+    # a generator, which rt.mosaic itself can't consume
+    merged = retrieve_module._mosaic_incrementally((cube for cube in cubes), geometry=GRID)
+
+    assert isinstance(merged, rt.MultiRaster)
+    assert merged.dtype == expected.dtype
+    np.testing.assert_array_equal(np.asarray(merged), np.asarray(expected))
+    # earlier cubes take precedence where they overlap
+    assert np.all(np.asarray(merged)[:, :, 2] == 1)
+
+
+def test_mosaic_incrementally_empty():
+    assert retrieve_module._mosaic_incrementally(iter(()), geometry=GRID) is None
+
+
+def test_retrieve_from_granules_mosaics_each_granule(monkeypatch):
+    cubes = {"a": _cube(slice(0, 3), 1), "b": _cube(slice(2, 5), 2)}
+    closed = []
+
+    class FakeGranule:
+        def __init__(self, name):
+            self.name = name
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            closed.append(self.name)
+
+        def reflectance(self, geometry):
+            return cubes[self.name]
+
+    monkeypatch.setattr(
+        retrieve_module,
+        "retrieve_EMIT_L2A_RFL_granule",
+        lambda remote_granule, **kwargs: FakeGranule(remote_granule)
+    )
+
+    merged = retrieve_module._retrieve_EMIT_L2A_RFL_from_granules(
+        search_results=["a", "b"],
+        date_UTC="2023-01-01",
+        geometry=GRID
+    )
+
+    np.testing.assert_array_equal(np.asarray(merged), np.asarray(rt.mosaic(list(cubes.values()), geometry=GRID)))
+    # every granule's files are closed once its subset has been read
+    assert closed == ["a", "b"]
+
+
+def test_retrieve_from_granules_without_usable_granules(monkeypatch):
+    def _fail(remote_granule, **kwargs):
+        raise OSError("download failed")
+
+    monkeypatch.setattr(retrieve_module, "retrieve_EMIT_L2A_RFL_granule", _fail)
+
+    with pytest.raises(retrieve_module.EMITNotAvailable):
+        retrieve_module._retrieve_EMIT_L2A_RFL_from_granules(
+            search_results=["a"],
+            date_UTC="2023-01-01",
+            geometry=GRID
+        )
+
+
+def test_mosaic_incrementally_leaves_the_warning_filters_alone():
+    # date_threads runs this from several threads, so it must not touch process-wide filters
+    filters = list(warnings.filters)
+    cubes = [_cube(slice(0, 3), 1), _cube(slice(2, 5), 2)]
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        retrieve_module._mosaic_incrementally(iter(cubes), geometry=GRID)
+
+    assert caught == []
+    assert warnings.filters == filters
@@ -0,0 +1,54 @@
+import threading
+
+import netCDF4
+import numpy as np
+import pytest
+
+from EMITL2ARFL import NETCDF_LOCK, read_dimensions, read_netcdf_array, show_netcdf_tree
+
+
+@pytest.fixture
+def netcdf_file(tmp_path):
+    filename = str(tmp_path / "granule.nc")
+
+    with netCDF4.Dataset(filename, "w") as ds:
+        ds.createDimension("x", 3)
+        ds.createVariable("reflectance", "f4", ("x",))[:] = [0.1, 0.2, 0.3]
+        location = ds.createGroup("location")
+        location.createDimension("x", 3)
+        location.createVariable("lat", "f8", ("x",))[:] = [36.0, 36.1, 36.2]
+
+    return filename
+
+
+def test_lock_is_shared_with_xarray():
+    from xarray.backends.locks import NETCDFC_LOCK
+
+    assert NETCDF_LOCK is NETCDFC_LOCK
+
+
+def test_read_waits_for_the_lock(netcdf_file):
+    result = {}
+    reader = threading.Thread(
+        target=lambda: result.update(array=read_netcdf_array(netcdf_file, "lat", group="location"))
+    )
+
+    with NETCDF_LOCK:
+        reader.start()
+        reader.join(timeout=0.5)
+        # the read can't start while another thread is inside netCDF-C
+        assert reader.is_alive()
+
+    reader.join(timeout=10)
+    assert not reader.is_alive()
+    np.testing.assert_allclose(result["array"], [36.0, 36.1, 36.2])
+
+
+def test_nested_readers_do_not_deadlock(netcdf_file):
+    # the tree recurses into groups and the lock isn't reentrant
+    tree = show_netcdf_tree(netcdf_file)
+
+    assert tree.startswith(f"File: {netcdf_file}")
+    assert "Group: location" in tree
+    assert read_dimensions(netcdf_file) == {"x": 3}
+    assert not NETCDF_LOCK.locked()
@@ -0,0 +1,49 @@
+from conftest import package_module
+
+search_module = package_module("search_earthaccess_granules")
+
+GRANULE_COUNT = 4500
+
+
+class FakeResponse:
+    def __init__(self, items, search_after):
+        self.items = items
+        self.headers = {"cmr-search-after": search_after} if search_after else {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"items": self.items}
+
+
+class FakeCMRSession:
+    """Serves GRANULE_COUNT granules in pages of at most page_size, like CMR search-after."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def get(self, url, headers=None, params=None):
+        start = int(headers.get("cmr-search-after", 0))
+        end = min(start + params["page_size"], GRANULE_COUNT)
+        self.requests += 1
+        items = [{"meta": {"concept-id": f"G{i}"}, "umm": {}} for i in range(start, end)]
+        return FakeResponse(items, str(end) if end < GRANULE_COUNT else None)
+
+
+def test_search_returns_every_page(monkeypatch):
+    session = FakeCMRSession()
+    generate_query = search_module.generate_earthaccess_query
+
+    def _query(**kwargs):
+        query = generate_query(**kwargs)
+        query.session = session
+        return query
+
+    monkeypatch.setattr(search_module, "generate_earthaccess_query", _query)
+
+    granules = search_module.search_earthaccess_granules(concept_ID="C2408750690-LPCLOUD")
+
+    # more than earthaccess's default limit of 2000
+    assert len(granules) == GRANULE_COUNT
+    assert session.requests == 3
@@ -0,0 +1,38 @@
+import numpy as np
+import rasters as rt
+from affine import Affine
+
+from conftest import package_module
+
+retrieve_module = package_module("retrieve_EMIT_L2A_RFL")
+
+
+def _grid(rows=4, cols=5):
+    return rt.RasterGrid.from_affine(Affine(60, 0, 300000, 0, -60, 4000000), rows, cols, crs="EPSG:32611")
+
+
+def test_grids_are_keyed_by_bounds_shape_and_crs():
+    assert retrieve_module._SearchGeometry(_grid()) == retrieve_module._SearchGeometry(_grid())
+    assert retrieve_module._SearchGeometry(_grid()) != retrieve_module._SearchGeometry(_grid(rows=5))
+    assert retrieve_module._SearchGeometry(rt.Point(-118.5, 36.8)).key == ("Point", "POINT (-118.5 36.8)", "EPSG:4326")
+
+
+def test_geometries_without_a_stable_key_are_searched_every_time(monkeypatch):
+    lon, lat = np.meshgrid(np.linspace(-118.6, -118.5, 5), np.linspace(36.9, 36.8, 4))
+    geolocation = rt.RasterGeolocation(x=lon, y=lat)
+    searches = []
+
+    monkeypatch.setattr(
+        retrieve_module,
+        "search_EMIT_L2A_RFL_granules",
+        lambda **kwargs: searches.append(kwargs["geometry"]) or []
+    )
+    monkeypatch.setattr(retrieve_module, "_retrieve_EMIT_L2A_RFL_from_granules", lambda **kwargs: None)
+    retrieve_module.retrieve_EMIT_L2A_RFL.cache_clear()
+
+    assert retrieve_module._SearchGeometry(geolocation).key is None
+
+    for _ in range(2):
+        retrieve_module.retrieve_EMIT_L2A_RFL("2023-01-01", geolocation)
+
+    assert searches == [geolocation, geolocation]
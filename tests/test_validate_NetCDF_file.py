@@ -0,0 +1,87 @@
+import os
+
+import netCDF4
+import pytest
+
+from EMITL2ARFL.exceptions import NetCDFCorruptedError, NetCDFEmptyFileError
+
+from conftest import package_module
+
+validate_module = package_module("validate_NetCDF_file")
+
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
+
+@pytest.fixture
+def netcdf_file(tmp_path):
+    filename = str(tmp_path / "reflectance.nc")
+
+    with netCDF4.Dataset(filename, "w") as ds:
+        ds.createDimension("x", 100)
+        ds.createVariable("reflectance", "f4", ("x",))[:] = range(100)
+
+    return filename
+
+
+def _superblock_v0(base_address, end_of_file_address):
+    # signature, versions, 8-byte offsets and lengths, leaf/internal K, flags
+    fixed = HDF5_SIGNATURE + bytes([0, 0, 0, 0, 0, 8, 8, 0]) + (4).to_bytes(2, "little") + (16).to_bytes(2, "little") + bytes(4)
+    addresses = [base_address, 0xFFFFFFFFFFFFFFFF, end_of_file_address, 0xFFFFFFFFFFFFFFFF]
+    return fixed + b"".join(address.to_bytes(8, "little") for address in addresses)
+
+
+def _superblock_v2(base_address, end_of_file_address):
+    fixed = HDF5_SIGNATURE + bytes([2, 8, 8, 0])
+    addresses = [base_address, 0xFFFFFFFFFFFFFFFF, end_of_file_address, 48]
+    return fixed + b"".join(address.to_bytes(8, "little") for address in addresses)
+
+
+def test_end_of_file_address_of_a_written_file(netcdf_file):
+    with open(netcdf_file, "rb") as f:
+        superblock = f.read(96)
+
+    assert validate_module._hdf5_end_of_file_address(superblock) == os.path.getsize(netcdf_file)
+
+
+@pytest.mark.parametrize("superblock", [_superblock_v0, _superblock_v2])
+def test_end_of_file_address_is_relative_to_the_base_address(superblock):
+    assert validate_module._hdf5_end_of_file_address(superblock(0, 5000)) == 5000
+    assert validate_module._hdf5_end_of_file_address(superblock(512, 5000)) == 5512
+
+
+@pytest.mark.parametrize("superblock", [
+    _superblock_v2(0, 0xFFFFFFFFFFFFFFFF),  # undefined address
+    HDF5_SIGNATURE + bytes([4, 8, 8, 0]) + bytes(32),  # unknown superblock version
+    HDF5_SIGNATURE + bytes([2, 3, 8, 0]) + bytes(32),  # unsupported offset size
+    _superblock_v2(0, 5000)[:30],  # cut off before the address
+])
+def test_end_of_file_address_unknown(superblock):
+    assert validate_module._hdf5_end_of_file_address(superblock) is None
+
+
+def test_complete_file_passes(netcdf_file):
+    validate_module.validate_NetCDF_file(netcdf_file)
+
+
+def test_truncated_file_is_rejected_from_its_header(netcdf_file):
+    with open(netcdf_file, "r+b") as f:
+        f.truncate(os.path.getsize(netcdf_file) // 2)
+
+    with pytest.raises(NetCDFCorruptedError, match="truncated"):
+        validate_module.validate_NetCDF_file(netcdf_file, deep=False)
+
+
+def test_missing_signature_is_rejected(tmp_path):
+    filename = tmp_path / "error.nc"
+    filename.write_bytes(b"<html>503 Service Unavailable</html>")
+
+    with pytest.raises(NetCDFCorruptedError, match="signature"):
+        validate_module.validate_NetCDF_file(filename, deep=False)
+
+
+def test_empty_file_is_rejected(tmp_path):
+    filename = tmp_path / "empty.nc"
+    filename.touch()
+
+    with pytest.raises(NetCDFEmptyFileError):
+        validate_module.validate_NetCDF_file(filename)